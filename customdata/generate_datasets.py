@@ -7,25 +7,85 @@ Target size: ~50MB each
 """
 
 import json
+import os
 import random
 import datetime
-from collections import defaultdict
-
-# Seed for reproducibility
-random.seed(42)
-
-def generate_dates(start_year=2000, end_year=2025, docs_per_quarter=200):
-    """Generate dates with multiple documents per quarter"""
+from bisect import bisect_left
+from concurrent.futures import ProcessPoolExecutor
+from itertools import groupby, islice
+
+try:
+    import orjson
+except ImportError:  # Fall back to the stdlib encoder
+    orjson = None
+
+
+def encode_json(value):
+    """Encode a value as compact UTF-8 JSON"""
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+# Default seed for reproducibility; each generator owns its own
+# random.Random so datasets never share RNG state
+SEED = 42
+
+# "-MM-DD" suffixes available in each quarter, as ASCII bytes; days stop
+# at 28 so every month is valid
+QUARTER_DAY_SUFFIXES = tuple(
+    tuple(
+        datetime.date(2000, month, day).isoformat()[4:].encode('ascii')
+        for month in range(first_month, first_month + 3)
+        for day in range(1, 29)
+    )
+    for first_month in (1, 4, 7, 10)
+)
+
+def generate_dates(rng, start_year=2000, end_year=2025, docs_per_quarter=200):
+    """Generate dates with multiple documents per quarter.
+
+    Returns (dates, years), where dates are ISO dates as ASCII bytes and
+    years[i] is the year of dates[i].
+    """
     dates = []
+    years = []
     for year in range(start_year, end_year + 1):
-        for quarter in range(1, 5):
-            # Generate dates within this quarter
-            quarter_start_month = (quarter - 1) * 3 + 1
-            for _ in range(docs_per_quarter):
-                month = quarter_start_month + random.randint(0, 2)
-                day = random.randint(1, 28)  # Safe for all months
-                dates.append(f"{year}-{month:02d}-{day:02d}")
-    return dates
+        year_prefix = str(year).encode('ascii')
+        for day_suffixes in QUARTER_DAY_SUFFIXES:
+            # Month and day are uniform within the quarter, so one draw of a
+            # precomputed suffix replaces formatting each date
+            dates.extend([year_prefix + suffix for suffix in rng.choices(day_suffixes, k=docs_per_quarter)])
+        years.extend([year] * (docs_per_quarter * len(QUARTER_DAY_SUFFIXES)))
+    return dates, years
+
+
+def build_sentences(pool, template_groups):
+    """
+    Render every sentence a (term, tone) pool can produce, each already
+    encoded as a JSON string literal.
+
+    Sentences are ordered term by term, each followed by all templates of
+    its tone. Every template group holds the same number of templates, so
+    a uniform draw from the result is a uniform term plus a uniform
+    template for that term.
+    """
+    return tuple(
+        encode_json(template.format(term))
+        for term, tone in pool
+        for template in template_groups[tone]
+    )
+
+
+def sample_records(rng, dates, sentences):
+    """
+    Yield one {"date", "text"} record per date as encoded JSON bytes,
+    drawing text from sentences.
+
+    The schema is fixed and the text is pre-encoded, so records are
+    assembled directly rather than built as dicts and serialized.
+    """
+    for date, text in zip(dates, rng.choices(sentences, k=len(dates))):
+        yield b'{"date":"' + date + b'","text":' + text + b'}'
 
 
 # ============ DATASET 1: Technology Evolution ============
@@ -94,24 +154,28 @@ TECH_TERMS = {
     ]
 }
 
-def get_tech_terms_for_year(year):
-    """Get relevant tech terms based on year"""
-    if 2000 <= year <= 2004:
-        return TECH_TERMS['early']
-    elif 2005 <= year <= 2008:
-        return TECH_TERMS['early'] + TECH_TERMS['mid']
-    elif 2009 <= year <= 2012:
-        return TECH_TERMS['mid'] + TECH_TERMS['transition']
-    elif 2013 <= year <= 2016:
-        return TECH_TERMS['transition'] + TECH_TERMS['modern']
-    elif 2017 <= year <= 2020:
-        return TECH_TERMS['modern'] + TECH_TERMS['recent']
-    else:  # 2021-2025
-        return TECH_TERMS['recent'] + TECH_TERMS['modern']
-
-def generate_tech_sentence(term, emotion):
-    """Generate a sentence about a tech topic with emotional tone"""
-    positive_templates = [
+# Last year of each era; later years (and anything before 2000) use the
+# final era
+TECH_ERA_END_YEARS = (2004, 2008, 2012, 2016, 2020)
+
+# Term pool for each era, built once so every year in an era shares it
+TECH_ERA_POOLS = (
+    tuple(TECH_TERMS['early']),                           # 2000-2004
+    tuple(TECH_TERMS['early'] + TECH_TERMS['mid']),       # 2005-2008
+    tuple(TECH_TERMS['mid'] + TECH_TERMS['transition']),  # 2009-2012
+    tuple(TECH_TERMS['transition'] + TECH_TERMS['modern']),  # 2013-2016
+    tuple(TECH_TERMS['modern'] + TECH_TERMS['recent']),   # 2017-2020
+    tuple(TECH_TERMS['recent'] + TECH_TERMS['modern'])    # 2021-2025
+)
+
+def get_tech_era(year):
+    """Index into TECH_ERA_POOLS for the given year"""
+    if year < 2000:
+        return len(TECH_ERA_END_YEARS)
+    return bisect_left(TECH_ERA_END_YEARS, year)
+
+TECH_TEMPLATES = {
+    'positive': [
         "The {} is absolutely amazing and transformative",
         "I'm thrilled about the recent advances in {}",
         "The {} has exceeded all expectations",
@@ -120,9 +184,8 @@ def generate_tech_sentence(term, emotion):
         "We're seeing incredible progress with {}",
         "{} is changing everything for the better",
         "The potential of {} is extraordinary"
-    ]
-
-    negative_templates = [
+    ],
+    'negative': [
         "The {} situation is concerning and problematic",
         "I'm worried about the implications of {}",
         "The {} has caused significant issues",
@@ -131,9 +194,8 @@ def generate_tech_sentence(term, emotion):
         "We need to address the {} crisis immediately",
         "{} is creating more harm than good",
         "The failure of {} is evident"
-    ]
-
-    neutral_templates = [
+    ],
+    'neutral': [
         "The {} continues to develop steadily",
         "Analysis shows {} is progressing as expected",
         "Implementation of {} is ongoing",
@@ -142,9 +204,8 @@ def generate_tech_sentence(term, emotion):
         "{} is becoming more prevalent",
         "Research into {} continues",
         "The {} sector shows consistent growth"
-    ]
-
-    surprise_templates = [
+    ],
+    'surprise': [
         "The unexpected breakthrough in {} is stunning",
         "Nobody predicted the {} revolution",
         "The {} announcement shocked the industry",
@@ -153,9 +214,8 @@ def generate_tech_sentence(term, emotion):
         "{} appeared out of nowhere",
         "The {} phenomenon took everyone by surprise",
         "Unexpected turns in {} development"
-    ]
-
-    fear_templates = [
+    ],
+    'fear': [
         "The {} poses serious security risks",
         "Growing concerns about {} safety",
         "The dangers of {} are becoming apparent",
@@ -165,40 +225,34 @@ def generate_tech_sentence(term, emotion):
         "The {} risk cannot be ignored",
         "Alarming issues with {} emerging"
     ]
+}
 
-    if emotion == 'joy':
-        template = random.choice(positive_templates)
-    elif emotion in ['sadness', 'anger', 'disgust']:
-        template = random.choice(negative_templates)
-    elif emotion == 'surprise':
-        template = random.choice(surprise_templates)
-    elif emotion == 'fear':
-        template = random.choice(fear_templates)
-    else:  # neutral
-        template = random.choice(neutral_templates)
+# Emotion -> template group
+TECH_EMOTION_TEMPLATES = {
+    'neutral': TECH_TEMPLATES['neutral'],
+    'joy': TECH_TEMPLATES['positive'],
+    'sadness': TECH_TEMPLATES['negative'],
+    'anger': TECH_TEMPLATES['negative'],
+    'disgust': TECH_TEMPLATES['negative'],
+    'surprise': TECH_TEMPLATES['surprise'],
+    'fear': TECH_TEMPLATES['fear']
+}
 
-    return template.format(term)
+TECH_ERA_SENTENCES = tuple(build_sentences(pool, TECH_EMOTION_TEMPLATES) for pool in TECH_ERA_POOLS)
 
-def generate_tech_evolution_dataset():
+def generate_tech_evolution_dataset(seed=SEED):
     """Generate technology evolution dataset with raw text"""
     print("Generating Tech Evolution dataset...")
-    dates = generate_dates(2000, 2025, docs_per_quarter=250)
-    data = []
-
-    for date in dates:
-        year = int(date.split('-')[0])
-        available_terms = get_tech_terms_for_year(year)
-
-        # Pick a random term and its associated emotion
-        term, emotion = random.choice(available_terms)
-        text = generate_tech_sentence(term, emotion)
-
-        data.append({
-            "date": date,
-            "text": text
-        })
+    rng = random.Random(seed)
+    dates, years = generate_dates(rng, 2000, 2025, docs_per_quarter=250)
 
-    return data
+    # Dates come out in year order, so every year of an era shares one
+    # term pool and the whole era is drawn in a single batch
+    start = 0
+    for era, era_years in groupby(years, key=get_tech_era):
+        end = start + sum(1 for _ in era_years)
+        yield from sample_records(rng, dates[start:end], TECH_ERA_SENTENCES[era])
+        start = end
 
 
 # ============ DATASET 2: Social Media Sentiment ============
@@ -227,60 +281,48 @@ SOCIAL_TOPICS = [
     ("toxic behavior", "negative"), ("positive movements", "positive")
 ]
 
-def generate_social_sentence(topic, sentiment):
-    """Generate a sentence about social media with sentiment"""
-    if sentiment == "positive":
-        templates = [
-            "The {} brings wonderful opportunities for connection",
-            "I absolutely love the {} and its impact",
-            "The {} is creating amazing experiences",
-            "People are thrilled about {}",
-            "The {} enhances our digital lives beautifully",
-            "{} is making a positive difference",
-            "The benefits of {} are incredible",
-            "We're seeing great results from {}"
-        ]
-    elif sentiment == "negative":
-        templates = [
-            "The {} is extremely problematic and harmful",
-            "I'm deeply concerned about {}",
-            "The {} creates serious issues for users",
-            "The negative impact of {} is undeniable",
-            "We must address the {} problem urgently",
-            "{} is damaging our social fabric",
-            "The dangers of {} are increasingly clear",
-            "The {} situation is getting worse"
-        ]
-    else:  # neutral
-        templates = [
-            "The {} continues to evolve and change",
-            "Analysis of {} shows mixed results",
-            "Users are adapting to {}",
-            "The {} landscape is shifting",
-            "Platforms are implementing {}",
-            "{} remains a topic of discussion",
-            "Researchers study {} patterns",
-            "The {} trend continues to develop"
-        ]
-
-    return random.choice(templates).format(topic)
-
-def generate_social_media_dataset():
-    """Generate social media dataset with raw text"""
-    print("Generating Social Media Sentiment dataset...")
-    dates = generate_dates(2000, 2025, docs_per_quarter=250)
-    data = []
+SOCIAL_TEMPLATES = {
+    'positive': [
+        "The {} brings wonderful opportunities for connection",
+        "I absolutely love the {} and its impact",
+        "The {} is creating amazing experiences",
+        "People are thrilled about {}",
+        "The {} enhances our digital lives beautifully",
+        "{} is making a positive difference",
+        "The benefits of {} are incredible",
+        "We're seeing great results from {}"
+    ],
+    'negative': [
+        "The {} is extremely problematic and harmful",
+        "I'm deeply concerned about {}",
+        "The {} creates serious issues for users",
+        "The negative impact of {} is undeniable",
+        "We must address the {} problem urgently",
+        "{} is damaging our social fabric",
+        "The dangers of {} are increasingly clear",
+        "The {} situation is getting worse"
+    ],
+    'neutral': [
+        "The {} continues to evolve and change",
+        "Analysis of {} shows mixed results",
+        "Users are adapting to {}",
+        "The {} landscape is shifting",
+        "Platforms are implementing {}",
+        "{} remains a topic of discussion",
+        "Researchers study {} patterns",
+        "The {} trend continues to develop"
+    ]
+}
 
-    for date in dates:
-        topic, sentiment = random.choice(SOCIAL_TOPICS)
-        text = generate_social_sentence(topic, sentiment)
+SOCIAL_SENTENCES = build_sentences(SOCIAL_TOPICS, SOCIAL_TEMPLATES)
 
-        data.append({
-            "date": date,
-            "text": text
-        })
+def generate_social_media_dataset(seed=SEED):
+    """Generate social media dataset with raw text"""
+    print("Generating Social Media Sentiment dataset...")
+    rng = random.Random(seed)
+    dates, _ = generate_dates(rng, 2000, 2025, docs_per_quarter=250)
 
-    return data
+    yield from sample_records(rng, dates, SOCIAL_SENTENCES)
 
 
 # ============ DATASET 3: Global Events ============
@@ -313,65 +355,86 @@ GLOBAL_EVENTS = [
     ("community resilience", "positive"), ("social breakdown", "negative")
 ]
 
-def generate_global_sentence(event, sentiment):
-    """Generate a sentence about global events"""
-    if sentiment == "positive":
-        templates = [
-            "The recent {} fills us with hope and optimism",
-            "We're witnessing remarkable progress in {}",
-            "The {} represents a major victory for humanity",
-            "People worldwide celebrate the {}",
-            "The {} demonstrates our collective strength",
-            "{} brings joy and inspiration globally",
-            "The success of {} is heartwarming",
-            "We're seeing wonderful developments in {}"
-        ]
-    else:  # negative
-        templates = [
-            "The tragic {} causes widespread suffering",
-            "We're devastated by the {}",
-            "The {} brings terrible consequences",
-            "Communities struggle with the {} crisis",
-            "The {} creates urgent humanitarian needs",
-            "{} leads to devastating outcomes",
-            "The impact of {} is heartbreaking",
-            "We face severe challenges from {}"
-        ]
-
-    return random.choice(templates).format(event)
-
-def generate_global_events_dataset():
+GLOBAL_TEMPLATES = {
+    'positive': [
+        "The recent {} fills us with hope and optimism",
+        "We're witnessing remarkable progress in {}",
+        "The {} represents a major victory for humanity",
+        "People worldwide celebrate the {}",
+        "The {} demonstrates our collective strength",
+        "{} brings joy and inspiration globally",
+        "The success of {} is heartwarming",
+        "We're seeing wonderful developments in {}"
+    ],
+    'negative': [
+        "The tragic {} causes widespread suffering",
+        "We're devastated by the {}",
+        "The {} brings terrible consequences",
+        "Communities struggle with the {} crisis",
+        "The {} creates urgent humanitarian needs",
+        "{} leads to devastating outcomes",
+        "The impact of {} is heartbreaking",
+        "We face severe challenges from {}"
+    ]
+}
+
+GLOBAL_SENTENCES = build_sentences(GLOBAL_EVENTS, GLOBAL_TEMPLATES)
+
+def generate_global_events_dataset(seed=SEED):
     """Generate global events dataset with raw text"""
     print("Generating Global Events dataset...")
-    dates = generate_dates(2000, 2025, docs_per_quarter=250)
-    data = []
+    rng = random.Random(seed)
+    dates, _ = generate_dates(rng, 2000, 2025, docs_per_quarter=250)
 
-    for date in dates:
-        event, sentiment = random.choice(GLOBAL_EVENTS)
-        text = generate_global_sentence(event, sentiment)
+    yield from sample_records(rng, dates, GLOBAL_SENTENCES)
 
-        data.append({
-            "date": date,
-            "text": text
-        })
 
-    return data
+# Output buffer size; a few large writes instead of many 8 KiB ones
+WRITE_BUFFER_SIZE = 1 << 20
 
+def save_dataset(records, filename, chunk_size=4096):
+    """
+    Save dataset to JSON file.
 
-def save_dataset(data, filename):
-    """Save dataset to JSON file"""
-    import os
+    Records are encoded JSON objects pulled from the iterable chunk_size
+    at a time, so the full dataset is never held in memory. Returns the
+    record count.
+    """
     # Get the directory where this script is located
     script_dir = os.path.dirname(os.path.abspath(__file__))
     filepath = os.path.join(script_dir, filename)
 
     print(f"Saving {filename}...")
-    with open(filepath, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    # The preprocessing API loads these files as one JSON array
+    records = iter(records)
+    count = 0
+    with open(filepath, 'wb', buffering=WRITE_BUFFER_SIZE) as f:
+        f.write(b'[')
+        while chunk := list(islice(records, chunk_size)):
+            if count:
+                f.write(b',')
+            f.write(b','.join(chunk))
+            count += len(chunk)
+        f.write(b']')
 
     # Print file size
     size_mb = os.path.getsize(filepath) / (1024 * 1024)
     print(f"  [OK] Saved {filename} ({size_mb:.2f} MB)")
+    return count
+
+
+DATASETS = (
+    ("TechEvolution2000-2025.json", generate_tech_evolution_dataset),
+    ("SocialMediaSentiment2000-2025.json", generate_social_media_dataset),
+    ("GlobalEvents2000-2025.json", generate_global_events_dataset)
+)
+
+
+def generate_and_save(index):
+    """Generate and save DATASETS[index]; runs in a worker process"""
+    filename, generate = DATASETS[index]
+    # Each dataset gets its own seed so output does not depend on scheduling
+    return save_dataset(generate(SEED + index), filename)
 
 
 def main():
@@ -382,22 +445,13 @@ def main():
     print("=" * 60)
     print()
 
-    # Dataset 1: Tech Evolution
-    tech_data = generate_tech_evolution_dataset()
-    save_dataset(tech_data, "TechEvolution2000-2025.json")
-    print(f"  Generated {len(tech_data)} documents")
-    print()
+    # The datasets are independent, so build them on separate cores
+    with ProcessPoolExecutor(max_workers=len(DATASETS)) as executor:
+        counts = list(executor.map(generate_and_save, range(len(DATASETS))))
 
-    # Dataset 2: Social Media
-    social_data = generate_social_media_dataset()
-    save_dataset(social_data, "SocialMediaSentiment2000-2025.json")
-    print(f"  Generated {len(social_data)} documents")
     print()
-
-    # Dataset 3: Global Events
-    events_data = generate_global_events_dataset()
-    save_dataset(events_data, "GlobalEvents2000-2025.json")
-    print(f"  Generated {len(events_data)} documents")
+    for (filename, _), count in zip(DATASETS, counts):
+        print(f"  Generated {count} documents for {filename}")
     print()
 
     print("=" * 60)
@@ -4,45 +4,553 @@ Handles file uploads, preprocessing, and serving datasets
 """
 
 import os
+import re
+import sys
 import json
+import hashlib
 import tempfile
+import uuid
+import time
+import gzip
+import shutil
+import stat
+import weakref
 from pathlib import Path
 from datetime import datetime
 from werkzeug.utils import secure_filename
-from flask import Flask, request, jsonify, send_file, Response, stream_with_context
+from werkzeug.security import safe_join
+from flask import Flask, Request, request, jsonify, send_file, Response, stream_with_context
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
-import traceback
 import queue
 import threading
+import atexit
+import logging
+from logging.handlers import QueueHandler, QueueListener
+from collections import OrderedDict, deque
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+
+try:
+    import orjson
+except ImportError:  # Fall back to Flask's stdlib JSON provider
+    orjson = None
 
 from preprocess import DataPreprocessor
 
 # Configuration
-UPLOAD_FOLDER = tempfile.gettempdir()
-ALLOWED_EXTENSIONS = {'csv', 'tsv', 'json', 'txt', 'xlsx'}
+# Point at a tmpfs such as /dev/shm to keep uploads off the disk. Files here
+# are named with UPLOAD_PREFIX/SPOOL_PREFIX, and only those are ever swept
+UPLOAD_FOLDER = os.environ.get(
+    "WORDSTREAM_UPLOAD_FOLDER", os.path.join(tempfile.gettempdir(), 'wordstream_uploads')
+)
+UPLOAD_PREFIX = 'wordstream_upload_'
+SPOOL_PREFIX = 'wordstream_spool_'
+ALLOWED_EXTENSIONS = frozenset({'csv', 'tsv', 'json', 'txt', 'xlsx'})
 MAX_FILE_SIZE = 50 * 1024 * 1024  # 50MB
+ANALYSIS_CACHE_SIZE = 10000  # Single-text results kept for /api/analyze-text
+ANALYSIS_BATCH_SIZE = 32  # Most single-text requests analyzed together
+ANALYSIS_BATCH_WINDOW = 0.01  # Seconds to wait for more texts to batch
+ANALYSIS_IDLE_TIMEOUT = 60  # Seconds before an idle batching thread exits
+ANALYSIS_TIMEOUT = 60  # Seconds a request waits for its batched analysis
+PREPROCESSOR_CACHE_SIZE = 5  # Preprocessors (and their models) kept loaded
+PRELOAD_MODELS = ("emotion", "goemotions", "sentiment", "topic", "happiness")
+PRELOAD = os.environ.get("WORDSTREAM_PRELOAD") == "1"  # Load PRELOAD_MODELS at startup
+RESULT_CACHE_FOLDER = os.path.join(tempfile.gettempdir(), 'wordstream_cache')
+RESULT_CACHE_MAX_AGE = 7 * 24 * 3600  # Seconds since last use before a cached result is removed
+RESULT_CACHE_MAX_BYTES = 2 * 1024 ** 3  # Least recently used results are removed past this
+DATA_FOLDER = Path(__file__).parent.parent / 'data'
+STALE_FILE_AGE = 3600  # Seconds before a leftover upload or partial write is removed
+STALE_SWEEP_INTERVAL = 15 * 60  # Seconds between sweeps for stale files
+GZIP_MIN_SIZE = 1024  # Data files smaller than this are served uncompressed
+METADATA_HEAD_SIZE = 64 * 1024  # Bytes read to find a dataset's leading metadata
+SSE_KEEPALIVE_INTERVAL = 15  # Seconds between keepalives on a quiet upload stream
+# Run sentiment models with int8 weights on CPU; faster, but shifts scores
+QUANTIZE_MODELS = os.environ.get("WORDSTREAM_QUANTIZE") == "1"
+# Compile sentiment models with torch.compile on CUDA; each worker stalls on
+# its first batches while compiling
+COMPILE_MODELS = os.environ.get("WORDSTREAM_COMPILE") == "1"
+
+# Request threads only enqueue log records; a background listener writes
+# them to stderr
+logger = logging.getLogger("wordstream")
+logger.setLevel(logging.INFO)
+logger.propagate = False
+log_queue = queue.Queue()
+logger.addHandler(QueueHandler(log_queue))
+log_listener = QueueListener(log_queue, logging.StreamHandler())
+log_listener.start()
+atexit.register(log_listener.stop)
+
+
+class UploadRequest(Request):
+    """Request that spools uploaded files straight into the upload folder"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.spooled_paths = []
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        # Werkzeug's default buffers the upload in a SpooledTemporaryFile that
+        # file.save() then copies again; writing it to disk once as it
+        # arrives lets save_upload() move it into place instead
+        stream = tempfile.NamedTemporaryFile(
+            'wb+', dir=app.config['UPLOAD_FOLDER'], prefix=SPOOL_PREFIX, delete=False
+        )
+        self.spooled_paths.append(stream.name)
+        return stream
+
+
+class ORJSONProvider(DefaultJSONProvider):
+    """JSON provider that serializes with orjson, keeping Flask's defaults"""
+
+    def dumps(self, obj, **kwargs):
+        # Dates still go through Flask's default handler for identical output
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_PASSTHROUGH_DATETIME
+        if kwargs.get('sort_keys', self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        if kwargs.get('indent'):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=kwargs.get('default', self.default), option=option).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
 
 app = Flask(__name__)
+app.request_class = UploadRequest
+if orjson is not None:
+    app.json = ORJSONProvider(app)
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
+os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 app.config['MAX_CONTENT_LENGTH'] = MAX_FILE_SIZE
 CORS(app)
 
-# Cache for preprocessors
-preprocessor_cache = {}
+# Least recently used preprocessors are evicted past PREPROCESSOR_CACHE_SIZE
+preprocessor_cache = OrderedDict()
+preprocessor_cache_lock = threading.Lock()
+# Every live preprocessor, including evicted ones that requests still hold
+preprocessor_refs = weakref.WeakValueDictionary()
+# Serializes model loads so concurrent first requests build one instance
+preprocessor_lock = threading.Lock()
 
 
 def get_preprocessor(sentiment_model: str = "emotion") -> DataPreprocessor:
     """Get or create preprocessor instance"""
-    if sentiment_model not in preprocessor_cache:
-        preprocessor_cache[sentiment_model] = DataPreprocessor(
-            sentiment_model=sentiment_model
-        )
-    return preprocessor_cache[sentiment_model]
+    with preprocessor_cache_lock:
+        processor = preprocessor_cache.get(sentiment_model)
+        if processor is not None:
+            preprocessor_cache.move_to_end(sentiment_model)
+            return processor
+
+    with preprocessor_lock:
+        with preprocessor_cache_lock:
+            processor = preprocessor_cache.get(sentiment_model)
+        if processor is None:
+            # Reuse an evicted preprocessor that is still in use rather than
+            # loading its model a second time
+            processor = preprocessor_refs.get(sentiment_model)
+            if processor is None:
+                processor = DataPreprocessor(
+                    sentiment_model=sentiment_model,
+                    quantize=QUANTIZE_MODELS,
+                    compile_model=COMPILE_MODELS
+                )
+                preprocessor_refs[sentiment_model] = processor
+            evicted = None
+            with preprocessor_cache_lock:
+                preprocessor_cache[sentiment_model] = processor
+                if len(preprocessor_cache) > PREPROCESSOR_CACHE_SIZE:
+                    evicted, _ = preprocessor_cache.popitem(last=False)
+            if evicted is not None:
+                logger.info(f"Evicted {evicted} preprocessor")
+                with analysis_batchers_lock:
+                    analysis_batchers.pop(evicted, None)
+    return processor
+
+
+class AnalysisBatcher:
+    """
+    Coalesce concurrent single-text analyses into batch_analyze calls.
+
+    A background thread waits up to ANALYSIS_BATCH_WINDOW after the first
+    pending text for more to arrive, then runs them through the model
+    together and resolves each caller's Future. The thread exits after
+    ANALYSIS_IDLE_TIMEOUT without work and is restarted by the next submit,
+    so an evicted model is not kept alive by its batcher.
+    """
+
+    def __init__(self, analyzer):
+        self.analyzer = analyzer
+        self.pending = queue.Queue()
+        self.lock = threading.Lock()
+        self.running = False
+
+    def submit(self, text: str) -> Future:
+        """Queue a text for analysis"""
+        future = Future()
+        with self.lock:
+            self.pending.put((text, future))
+            if not self.running:
+                self.running = True
+                threading.Thread(target=self._run, daemon=True).start()
+        return future
+
+    def _run(self):
+        while True:
+            try:
+                batch = [self.pending.get(timeout=ANALYSIS_IDLE_TIMEOUT)]
+            except queue.Empty:
+                with self.lock:
+                    if self.pending.empty():
+                        self.running = False
+                        return
+                continue
+            deadline = time.monotonic() + ANALYSIS_BATCH_WINDOW
+            while len(batch) < ANALYSIS_BATCH_SIZE:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self.pending.get(timeout=timeout))
+                except queue.Empty:
+                    break
+
+            # raise_errors: a model failure must not come back as a neutral
+            # result for every text that happened to share the batch
+            try:
+                results = self.analyzer.batch_analyze(
+                    [text for text, _ in batch], batch_size=ANALYSIS_BATCH_SIZE, raise_errors=True
+                )
+            except Exception as e:
+                if len(batch) == 1:
+                    batch[0][1].set_exception(e)
+                    continue
+                # Retry each text on its own, so a bad input only fails its
+                # own request and each failure gets its own exception
+                for text, future in batch:
+                    try:
+                        future.set_result(self.analyzer.batch_analyze([text], batch_size=1, raise_errors=True)[0])
+                    except Exception as text_error:
+                        future.set_exception(text_error)
+            else:
+                for (_, future), result in zip(batch, results):
+                    future.set_result(result)
+
+
+# One batcher per sentiment model
+analysis_batchers = {}
+analysis_batchers_lock = threading.Lock()
+
+
+def get_analysis_batcher(sentiment_model: str) -> AnalysisBatcher:
+    """Get or create the batcher for a model's sentiment analyzer"""
+    batcher = analysis_batchers.get(sentiment_model)
+    if batcher is None:
+        analyzer = get_preprocessor(sentiment_model).sentiment_analyzer
+        with analysis_batchers_lock:
+            batcher = analysis_batchers.get(sentiment_model)
+            if batcher is None:
+                batcher = AnalysisBatcher(analyzer)
+                analysis_batchers[sentiment_model] = batcher
+    return batcher
+
+
+# Recent single-text results, keyed by (sentiment_model, text digest)
+analysis_cache = OrderedDict()
+analysis_cache_lock = threading.Lock()
+
+
+def analyze_single_text(text: str, sentiment_model: str):
+    """
+    Analyze one text, reusing the result for repeated requests.
+
+    Model errors are raised rather than answered with the analyzers'
+    neutral fallback, so a transient failure (OOM, CUDA error) is never
+    cached. Returns None if the model has no analyzer.
+    """
+    key = (sentiment_model, hashlib.blake2b(str(text).encode('utf-8'), digest_size=16).digest())
+    with analysis_cache_lock:
+        if key in analysis_cache:
+            analysis_cache.move_to_end(key)
+            return analysis_cache[key]
+
+    processor = get_preprocessor(sentiment_model)
+
+    # Handle topic detection vs sentiment analysis
+    if sentiment_model == "topic":
+        result = processor.topic_detector.detect_topic(text, raise_errors=True)
+    elif processor.sentiment_analyzer:
+        # The batcher analyzes with raise_errors as well
+        result = get_analysis_batcher(sentiment_model).submit(text).result(timeout=ANALYSIS_TIMEOUT)
+    else:
+        return None
+
+    with analysis_cache_lock:
+        analysis_cache[key] = result
+        if len(analysis_cache) > ANALYSIS_CACHE_SIZE:
+            analysis_cache.popitem(last=False)
+    return result
+
+
+def processing_version() -> str:
+    """
+    Digest of the processing and model code.
+
+    Part of every result cache key, so results cached by an older version
+    (or for a different model setup) are never served after an upgrade.
+    """
+    hasher = hashlib.blake2b(digest_size=8)
+    for name in ('preprocess', 'sentiment_analyzer'):
+        path = getattr(sys.modules.get(name), '__file__', None)
+        if path:
+            with open(path, 'rb') as f:
+                hasher.update(f.read())
+    return hasher.hexdigest()
+
+
+PROCESSING_VERSION = processing_version()
+
+
+def process_dataset_cached(file_path: str, sentiment_model: str, date_column: str,
+                           text_column: str, progress_callback=None) -> dict:
+    """
+    Process a dataset file, reusing the stored result for identical input.
+
+    Results are keyed by a hash of the file contents, the processing
+    parameters and PROCESSING_VERSION, so re-processing the same file skips
+    the model entirely. prune_result_cache() removes old entries.
+    """
+    hasher = hashlib.blake2b(digest_size=16)
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            hasher.update(block)
+    hasher.update(json.dumps([
+        PROCESSING_VERSION, sentiment_model, date_column, text_column, QUANTIZE_MODELS, COMPILE_MODELS
+    ]).encode('utf-8'))
+    cache_path = os.path.join(RESULT_CACHE_FOLDER, f"{hasher.hexdigest()}.json")
+
+    try:
+        result = read_json(cache_path)
+    except FileNotFoundError:
+        pass
+    else:
+        logger.info(f"Using cached result for {file_path}")
+        # Mark it used, so pruning removes least recently used results first
+        try:
+            os.utime(cache_path)
+        except OSError:
+            pass  # Pruned meanwhile
+        # The stored metadata describes the request that created the entry
+        metadata = result["metadata"]
+        metadata["dataset_name"] = Path(file_path).stem
+        metadata["created"] = datetime.now().isoformat()
+        if progress_callback:
+            total_docs = metadata["total_documents"]
+            progress_callback(total_docs, total_docs, "Using cached result...")
+        return result
+
+    processor = get_preprocessor(sentiment_model)
+    result = processor.process_dataset(
+        file_path,
+        date_column=date_column,
+        text_column=text_column,
+        output_format=sentiment_model,
+        progress_callback=progress_callback
+    )
+
+    os.makedirs(RESULT_CACHE_FOLDER, exist_ok=True)
+    write_dataset(cache_path, result)
+    return result
+
+
+# Timestamp for health/status polling, formatted at most once per second
+timestamp_second = None
+timestamp_text = ''
+timestamp_lock = threading.Lock()
+
+
+def current_timestamp() -> str:
+    """Current local time as an ISO string with second resolution"""
+    global timestamp_second, timestamp_text
+    second = int(time.time())
+    if second != timestamp_second:
+        with timestamp_lock:
+            if second != timestamp_second:
+                timestamp_text = datetime.fromtimestamp(second).isoformat()
+                timestamp_second = second
+    return timestamp_text
 
 
 def allowed_file(filename: str) -> bool:
     """Check if file extension is allowed"""
-    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+    _, dot, extension = filename.rpartition('.')
+    return bool(dot) and extension.lower() in ALLOWED_EXTENSIONS
+
+
+def save_upload(file, temp_path: str):
+    """Save an uploaded file to temp_path, moving it if it was spooled to disk"""
+    spooled_path = getattr(file.stream, 'name', None)
+    if spooled_path in request.spooled_paths:
+        file.stream.close()
+        os.replace(spooled_path, temp_path)
+    else:
+        file.save(temp_path)
+
+
+def encode_json(obj) -> bytes:
+    """Encode a constant response body once, as jsonify would"""
+    return (app.json.dumps(obj) + "\n").encode('utf-8')
+
+
+def dump_json(obj) -> bytes:
+    """Encode obj as compact UTF-8 JSON"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def write_dataset(path, result: dict) -> int:
+    """
+    Write a processed {"metadata", "data"} result to path.
+
+    Periods are encoded and written one at a time, so the JSON text of a
+    large dataset is never held in memory as a whole. The file is written
+    under a unique name and renamed into place, so readers never see a
+    partial dataset. Returns the number of bytes written.
+    """
+    partial_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    try:
+        with open(partial_path, 'wb') as f:
+            f.write(b'{"metadata":' + dump_json(result['metadata']) + b',"data":[')
+            for i, period in enumerate(result['data']):
+                if i:
+                    f.write(b',')
+                f.write(dump_json(period))
+            f.write(b']}')
+            size = f.tell()
+        os.replace(partial_path, path)
+    except BaseException:
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+        raise
+    return size
+
+
+def remove_stale_files(folder, pattern: str):
+    """Remove files matching pattern that a killed request left in folder"""
+    cutoff = time.time() - STALE_FILE_AGE
+    for stale_path in Path(folder).glob(pattern):
+        try:
+            if stale_path.stat().st_mtime < cutoff:
+                stale_path.unlink()
+        except OSError:
+            pass  # Finished or removed by another worker
+
+
+def prune_result_cache():
+    """
+    Remove cached results unused for RESULT_CACHE_MAX_AGE, then the least
+    recently used ones until the cache fits in RESULT_CACHE_MAX_BYTES.
+    """
+    entries = []
+    for cache_path in Path(RESULT_CACHE_FOLDER).glob('*.json*'):
+        if cache_path.suffix == '.tmp':
+            continue  # Partial writes are left to remove_stale_files
+        try:
+            file_stat = cache_path.stat()
+        except OSError:
+            continue
+        entries.append((file_stat.st_mtime, file_stat.st_size, cache_path))
+
+    cutoff = time.time() - RESULT_CACHE_MAX_AGE
+    total_size = sum(size for _, size, _ in entries)
+    for mtime, size, cache_path in sorted(entries):
+        if mtime >= cutoff and total_size <= RESULT_CACHE_MAX_BYTES:
+            break
+        try:
+            cache_path.unlink()
+        except OSError:
+            pass  # Removed by another worker
+        total_size -= size
+
+
+def sweep_stale_files():
+    """Remove stale uploads and partial writes every STALE_SWEEP_INTERVAL"""
+    while True:
+        remove_stale_files(UPLOAD_FOLDER, f'{UPLOAD_PREFIX}*')
+        remove_stale_files(UPLOAD_FOLDER, f'{SPOOL_PREFIX}*')
+        remove_stale_files(DATA_FOLDER, '*.tmp')
+        remove_stale_files(RESULT_CACHE_FOLDER, '*.tmp')
+        prune_result_cache()
+        time.sleep(STALE_SWEEP_INTERVAL)
+
+
+def read_json(path):
+    """Read a UTF-8 JSON file, such as one written by write_dataset"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
+METADATA_START = re.compile(rb'\s*\{\s*"metadata"\s*:\s*')
+
+
+def read_metadata(path) -> dict:
+    """
+    Read the metadata of a processed dataset without parsing its periods.
+
+    Processed datasets start with their metadata, so usually only the head
+    of the file is decoded; other files fall back to a full parse.
+    """
+    with open(path, 'rb') as f:
+        head = f.read(METADATA_HEAD_SIZE)
+    match = METADATA_START.match(head)
+    if match:
+        try:
+            metadata, _ = json.JSONDecoder().raw_decode(head.decode('utf-8', 'ignore'), match.end())
+            return metadata
+        except ValueError:
+            pass  # Metadata runs past the head
+    return read_json(path).get('metadata', {})
+
+
+def sse_event(payload: dict) -> bytes:
+    """Format a payload as a Server-Sent Events data frame"""
+    return b'data: ' + dump_json(payload) + b'\n\n'
+
+
+def stream_result(result: dict, message: str):
+    """
+    Yield a {"success", "data", "message"} response body piece by piece.
+
+    Periods are encoded one at a time, so the JSON text of a large result
+    is never built in memory as a single string.
+    """
+    dumps = app.json.dumps
+    yield '{"data":{"data":['
+    for i, period in enumerate(result['data']):
+        if i:
+            yield ','
+        yield dumps(period)
+    yield '],"metadata":' + dumps(result['metadata'])
+    yield '},"message":' + dumps(message) + ',"success":true}\n'
+
+
+@app.before_request
+def reject_oversized_requests():
+    """Reject bodies declared larger than the limit before reading any of them"""
+    if request.content_length and request.content_length > MAX_FILE_SIZE:
+        return Response(TOO_LARGE_RESPONSE, status=413, mimetype='application/json')
+
+
+@app.teardown_request
+def remove_spooled_uploads(error=None):
+    """Remove spooled uploads that no handler moved into place"""
+    if request.spooled_paths:
+        request.close()
+        for path in request.spooled_paths:
+            if os.path.exists(path):
+                os.remove(path)
 
 
 @app.route('/health', methods=['GET'])
@@ -50,7 +558,7 @@ def health_check():
     """Health check endpoint"""
     return jsonify({
         "status": "healthy",
-        "timestamp": datetime.now().isoformat(),
+        "timestamp": current_timestamp(),
         "service": "WordStream Preprocessor API"
     })
 
@@ -90,24 +598,16 @@ def upload_file():
 
         # Save uploaded file temporarily
         filename = secure_filename(file.filename)
-        temp_path = os.path.join(app.config['UPLOAD_FOLDER'], f"upload_{datetime.now().timestamp()}_{filename}")
-        file.save(temp_path)
+        temp_path = os.path.join(app.config['UPLOAD_FOLDER'], f"{UPLOAD_PREFIX}{uuid.uuid4().hex}_{filename}")
+        save_upload(file, temp_path)
 
         try:
-            # Get preprocessor
-            processor = get_preprocessor(sentiment_model)
-
             # Process file
-            result = processor.process_dataset(
-                temp_path,
-                date_column=date_column,
-                text_column=text_column,
-                output_format=sentiment_model
-            )
+            result = process_dataset_cached(temp_path, sentiment_model, date_column, text_column)
 
             # Save result to data directory instead of sending in response
             # This prevents timeout/memory issues with large datasets
-            data_dir = Path(__file__).parent.parent / 'data'
+            data_dir = DATA_FOLDER
             data_dir.mkdir(exist_ok=True)
 
             # Generate output filename based on original name
@@ -116,12 +616,9 @@ def upload_file():
             output_path = data_dir / output_filename
 
             # Save to file
-            with open(output_path, 'w', encoding='utf-8') as f:
-                json.dump(result, f, ensure_ascii=False, indent=2)
-
-            file_size_mb = output_path.stat().st_size / (1024 * 1024)
+            file_size_mb = save_data_file(output_path, result) / (1024 * 1024)
 
-            print(f"✓ Saved processed dataset to {output_path} ({file_size_mb:.2f} MB)")
+            logger.info(f"✓ Saved processed dataset to {output_path} ({file_size_mb:.2f} MB)")
 
             return jsonify({
                 "success": True,
@@ -138,14 +635,22 @@ def upload_file():
                 os.remove(temp_path)
 
     except Exception as e:
-        print(f"Error in /api/upload: {e}")
-        print(traceback.format_exc())
+        logger.exception(f"Error in /api/upload: {e}")
         return jsonify({
             "error": str(e),
             "message": "Error processing file"
         }), 500
 
 
+# Constant Server-Sent Events frames for /api/upload-stream
+SSE_NO_FILE = sse_event({'error': 'No file provided'})
+SSE_NO_FILENAME = sse_event({'error': 'No file selected'})
+SSE_BAD_TYPE = sse_event({'error': 'File type not allowed'})
+SSE_UPLOADED = sse_event({'type': 'progress', 'current': 0, 'total': 100, 'message': 'File uploaded, starting processing...'})
+SSE_SAVING = sse_event({'type': 'progress', 'percent': 90, 'message': 'Saving processed data...'})
+SSE_KEEPALIVE = b': keepalive\n\n'
+
+
 @app.route('/api/upload-stream', methods=['POST'])
 def upload_file_stream():
     """
@@ -158,16 +663,16 @@ def upload_file_stream():
         try:
             # Validate file exists
             if 'file' not in request.files:
-                yield f"data: {json.dumps({'error': 'No file provided'})}\n\n"
+                yield SSE_NO_FILE
                 return
 
             file = request.files['file']
             if file.filename == '':
-                yield f"data: {json.dumps({'error': 'No file selected'})}\n\n"
+                yield SSE_NO_FILENAME
                 return
 
             if not allowed_file(file.filename):
-                yield f"data: {json.dumps({'error': f'File type not allowed'})}\n\n"
+                yield SSE_BAD_TYPE
                 return
 
             # Get parameters
@@ -177,19 +682,24 @@ def upload_file_stream():
 
             # Save uploaded file temporarily
             filename = secure_filename(file.filename)
-            temp_path = os.path.join(app.config['UPLOAD_FOLDER'], f"upload_{datetime.now().timestamp()}_{filename}")
-            file.save(temp_path)
+            temp_path = os.path.join(app.config['UPLOAD_FOLDER'], f"{UPLOAD_PREFIX}{uuid.uuid4().hex}_{filename}")
+            save_upload(file, temp_path)
 
             # Send initial progress
-            yield f"data: {json.dumps({'type': 'progress', 'current': 0, 'total': 100, 'message': 'File uploaded, starting processing...'})}\n\n"
+            yield SSE_UPLOADED
 
-            # Get preprocessor
-            processor = get_preprocessor(sentiment_model)
+            # Progress frames are formatted here, in the response generator
+            last_percent = None
 
-            # Progress callback
-            def progress_callback(current, total, message):
+            def progress_frame(current, total, message):
+                nonlocal last_percent
                 # Calculate percentage (30-90% of total progress for processing)
                 percent = 30 + int((current / total) * 60)
+                # Drop count updates that don't move the bar; stage changes are
+                # reported with current == total and always sent
+                if percent == last_percent and current < total:
+                    return None
+                last_percent = percent
                 progress_data = {
                     'type': 'progress',
                     'current': current,
@@ -197,73 +707,87 @@ def upload_file_stream():
                     'percent': percent,
                     'message': message
                 }
-                return f"data: {json.dumps(progress_data)}\n\n"
+                return sse_event(progress_data)
 
-            # Create a queue for progress updates
-            progress_queue = queue.Queue()
+            # The processing thread only records raw updates and never waits
+            # on the client; old updates are dropped if it falls far behind
+            progress_updates = deque(maxlen=256)
+            progress_ready = threading.Condition()
+            processing_done = False
 
-            def queued_progress_callback(current, total, message):
-                progress_queue.put(progress_callback(current, total, message))
+            def progress_callback(current, total, message):
+                with progress_ready:
+                    progress_updates.append((current, total, message))
+                    progress_ready.notify()
 
             # Process file in a separate thread
             result_container = {}
             error_container = {}
 
             def process_file():
+                nonlocal processing_done
                 try:
-                    result = processor.process_dataset(
+                    result = process_dataset_cached(
                         temp_path,
-                        date_column=date_column,
-                        text_column=text_column,
-                        output_format=sentiment_model,
-                        progress_callback=queued_progress_callback
+                        sentiment_model,
+                        date_column,
+                        text_column,
+                        progress_callback=progress_callback
                     )
                     result_container['data'] = result
                 except Exception as e:
+                    logger.exception(f"Error processing {filename} in /api/upload-stream: {e}")
                     error_container['error'] = str(e)
-                    error_container['traceback'] = traceback.format_exc()
+                finally:
+                    with progress_ready:
+                        processing_done = True
+                        progress_ready.notify()
 
             # Start processing thread
             process_thread = threading.Thread(target=process_file)
             process_thread.start()
 
-            # Yield progress updates as they come
-            while process_thread.is_alive() or not progress_queue.empty():
-                try:
-                    # Get progress update with timeout
-                    progress_msg = progress_queue.get(timeout=0.5)
-                    yield progress_msg
-                except queue.Empty:
+            # Yield progress updates as they come, all pending ones at once
+            done = False
+            while not done:
+                with progress_ready:
+                    if not progress_updates and not processing_done:
+                        progress_ready.wait(timeout=SSE_KEEPALIVE_INTERVAL)
+                    updates = list(progress_updates)
+                    progress_updates.clear()
+                    done = processing_done
+
+                frames = [frame for frame in (progress_frame(*update) for update in updates) if frame]
+                if frames:
+                    yield b''.join(frames)
+                elif not updates and not done:
                     # Send keepalive
-                    yield f": keepalive\n\n"
+                    yield SSE_KEEPALIVE
 
             # Wait for thread to complete
             process_thread.join()
 
             # Check for errors
             if error_container:
-                yield f"data: {json.dumps({'type': 'error', 'error': error_container['error']})}\n\n"
+                yield sse_event({'type': 'error', 'error': error_container['error']})
                 return
 
             result = result_container['data']
 
             # Send progress: saving file
-            yield f"data: {json.dumps({'type': 'progress', 'percent': 90, 'message': 'Saving processed data...'})}\n\n"
+            yield SSE_SAVING
 
             # Save result to data directory
-            data_dir = Path(__file__).parent.parent / 'data'
+            data_dir = DATA_FOLDER
             data_dir.mkdir(exist_ok=True)
 
             original_name = Path(filename).stem
             output_filename = f"{original_name}_processed_{sentiment_model}.json"
             output_path = data_dir / output_filename
 
-            with open(output_path, 'w', encoding='utf-8') as f:
-                json.dump(result, f, ensure_ascii=False, indent=2)
+            file_size_mb = save_data_file(output_path, result) / (1024 * 1024)
 
-            file_size_mb = output_path.stat().st_size / (1024 * 1024)
-
-            print(f"✓ Saved processed dataset to {output_path} ({file_size_mb:.2f} MB)")
+            logger.info(f"✓ Saved processed dataset to {output_path} ({file_size_mb:.2f} MB)")
 
             # Send completion
             completion_data = {
@@ -275,12 +799,11 @@ def upload_file_stream():
                 'file_size_mb': round(file_size_mb, 2),
                 'message': f"Successfully processed {result['metadata']['total_documents']} documents"
             }
-            yield f"data: {json.dumps(completion_data)}\n\n"
+            yield sse_event(completion_data)
 
         except Exception as e:
-            print(f"Error in /api/upload-stream: {e}")
-            print(traceback.format_exc())
-            yield f"data: {json.dumps({'type': 'error', 'error': str(e)})}\n\n"
+            logger.exception(f"Error in /api/upload-stream: {e}")
+            yield sse_event({'type': 'error', 'error': str(e)})
 
         finally:
             # Clean up temp file
@@ -310,7 +833,9 @@ def preprocess_dataset():
             return jsonify({"error": "Missing file_path"}), 400
 
         file_path = data['file_path']
-        if not os.path.exists(file_path):
+        # One stat that also rejects directories, which would otherwise
+        # fail later inside processing
+        if not os.path.isfile(file_path):
             return jsonify({"error": f"File not found: {file_path}"}), 404
 
         # Get parameters
@@ -319,23 +844,13 @@ def preprocess_dataset():
         sentiment_model = data.get('sentiment_model', 'emotion')
 
         # Process
-        processor = get_preprocessor(sentiment_model)
-        result = processor.process_dataset(
-            file_path,
-            date_column=date_column,
-            text_column=text_column,
-            output_format=sentiment_model
-        )
+        result = process_dataset_cached(file_path, sentiment_model, date_column, text_column)
 
-        return jsonify({
-            "success": True,
-            "data": result,
-            "message": f"Successfully processed {result['metadata']['total_documents']} documents"
-        })
+        message = f"Successfully processed {result['metadata']['total_documents']} documents"
+        return Response(stream_result(result, message), mimetype='application/json')
 
     except Exception as e:
-        print(f"Error in /api/preprocess: {e}")
-        print(traceback.format_exc())
+        logger.exception(f"Error in /api/preprocess: {e}")
         return jsonify({
             "error": str(e),
             "message": "Error processing dataset"
@@ -360,16 +875,15 @@ def analyze_text():
             return jsonify({"error": "Missing text field"}), 400
 
         text = data['text']
-        sentiment_model = data.get('sentiment_model', 'emotion')
+        # Checked here, before the text can join (and fail) a shared batch;
+        # empty texts still get the analyzer's neutral result
+        if not isinstance(text, str):
+            return jsonify({"error": "text must be a string"}), 400
 
-        processor = get_preprocessor(sentiment_model)
+        sentiment_model = data.get('sentiment_model', 'emotion')
 
-        # Handle topic detection vs sentiment analysis
-        if sentiment_model == "topic":
-            result = processor.topic_detector.detect_topic(text)
-        elif processor.sentiment_analyzer:
-            result = processor.sentiment_analyzer.analyze_text(text)
-        else:
+        result = analyze_single_text(text, sentiment_model)
+        if result is None:
             return jsonify({"error": "Analyzer not available"}), 400
 
         return jsonify({
@@ -377,14 +891,81 @@ def analyze_text():
             "analysis": result
         })
 
+    except FutureTimeoutError:
+        logger.warning("Timed out waiting for analysis in /api/analyze-text")
+        return jsonify({
+            "error": "Analysis timed out",
+            "message": "Error analyzing text"
+        }), 504
+
     except Exception as e:
-        print(f"Error in /api/analyze-text: {e}")
+        logger.exception(f"Error in /api/analyze-text: {e}")
         return jsonify({
             "error": str(e),
             "message": "Error analyzing text"
         }), 500
 
 
+# One lock per data file being compressed, so concurrent first requests
+# compress it once
+gzip_locks = weakref.WeakValueDictionary()
+gzip_locks_lock = threading.Lock()
+
+
+def gzip_data_file(file_path: str, file_stat: os.stat_result) -> str:
+    """
+    Return the path of a gzip copy of a data file.
+
+    The copy is keyed by the file's path, size and mtime, so each version of
+    a dataset is compressed once and reused by later requests. Copies of
+    older versions are removed when a new one is written.
+    """
+    key = hashlib.blake2b(os.path.abspath(file_path).encode('utf-8'), digest_size=16).hexdigest()
+    gz_path = os.path.join(RESULT_CACHE_FOLDER, f"{key}_{file_stat.st_mtime_ns}_{file_stat.st_size}.json.gz")
+
+    if os.path.exists(gz_path):
+        return gz_path
+
+    with gzip_locks_lock:
+        lock = gzip_locks.get(key)
+        if lock is None:
+            lock = threading.Lock()
+            gzip_locks[key] = lock
+    with lock:
+        if not os.path.exists(gz_path):
+            os.makedirs(RESULT_CACHE_FOLDER, exist_ok=True)
+            partial_path = f"{gz_path}.{uuid.uuid4().hex}.tmp"
+            with open(file_path, 'rb') as src, gzip.open(partial_path, 'wb', compresslevel=6) as dst:
+                shutil.copyfileobj(src, dst, 1 << 20)
+            os.replace(partial_path, gz_path)
+
+            for old_path in Path(RESULT_CACHE_FOLDER).glob(f"{key}_*.json.gz"):
+                if os.fspath(old_path) != gz_path:
+                    try:
+                        old_path.unlink()
+                    except OSError:
+                        pass  # Removed by another worker, or still open elsewhere
+    return gz_path
+
+
+def save_data_file(output_path: Path, result: dict) -> int:
+    """
+    Write a processed result to data/ along with its gzip copy.
+
+    Compressing here, while the dataset is being processed anyway, means
+    no request for it has to wait for the compression. Returns the number
+    of bytes written.
+    """
+    size = write_dataset(output_path, result)
+    if size >= GZIP_MIN_SIZE:
+        try:
+            gzip_data_file(os.fspath(output_path), os.stat(output_path))
+        except OSError:
+            # The first gzip request compresses it instead
+            logger.warning(f"Could not write gzip copy of {output_path}", exc_info=True)
+    return size
+
+
 @app.route('/data/<path:filename>', methods=['GET'])
 def serve_data_file(filename):
     """
@@ -392,82 +973,129 @@ def serve_data_file(filename):
     This allows the frontend to load dataset JSON files directly.
     """
     try:
-        data_dir = Path(__file__).parent.parent / 'data'
-        file_path = data_dir / filename
-
-        # Security check: ensure the file is within data directory
-        if not file_path.resolve().is_relative_to(data_dir.resolve()):
+        # Security check: ensure the file is within data directory. safe_join
+        # only checks the path string, so also resolve symlinks that point
+        # out of it
+        file_path = safe_join(os.fspath(DATA_FOLDER), filename)
+        if file_path is None or not Path(file_path).resolve().is_relative_to(DATA_FOLDER.resolve()):
             return jsonify({
                 "error": "Access denied",
                 "message": "File must be in data directory"
             }), 403
 
         # Check if file exists
-        if not file_path.exists():
+        try:
+            file_stat = os.stat(file_path)
+        except OSError:
+            file_stat = None
+        if file_stat is None or not stat.S_ISREG(file_stat.st_mode):
             return jsonify({
                 "error": "File not found",
                 "message": f"Dataset file '{filename}' not found"
             }), 404
 
-        # Serve the file
-        return send_file(
-            file_path,
-            mimetype='application/json',
-            as_attachment=False,
-            download_name=filename
-        )
+        # Serve the file; send_file answers If-None-Match/If-Modified-Since
+        # with 304, and JSON compresses well, so gzip it for clients that accept it.
+        # Range requests get the identity file, so byte ranges stay offsets
+        # into the JSON rather than into the gzip stream
+        if (request.accept_encodings['gzip'] and file_stat.st_size >= GZIP_MIN_SIZE
+                and 'Range' not in request.headers):
+            response = send_file(
+                gzip_data_file(file_path, file_stat),
+                mimetype='application/json',
+                as_attachment=False,
+                download_name=filename
+            )
+            response.headers['Content-Encoding'] = 'gzip'
+        else:
+            response = send_file(
+                file_path,
+                mimetype='application/json',
+                as_attachment=False,
+                download_name=filename
+            )
+        response.vary.add('Accept-Encoding')
+        return response
 
     except Exception as e:
-        print(f"Error serving data file {filename}: {e}")
+        logger.exception(f"Error serving data file {filename}: {e}")
         return jsonify({
             "error": str(e),
             "message": "Error serving file"
         }), 500
 
 
+# /api/datasets entries keyed by file name, with the (mtime_ns, size) they
+# were built from
+dataset_cache = {}
+dataset_cache_lock = threading.Lock()
+
+
+def describe_dataset(json_file: Path) -> dict:
+    """Build a dataset listing entry, reparsing the file only when it changes"""
+    file_stat = json_file.stat()
+    signature = (file_stat.st_mtime_ns, file_stat.st_size)
+    with dataset_cache_lock:
+        cached = dataset_cache.get(json_file.name)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+
+    file_size = file_stat.st_size / (1024 * 1024)  # MB
+    file_name = json_file.stem  # Filename without extension
+    try:
+        # Try to read metadata if available
+        metadata = read_metadata(json_file)
+
+        entry = {
+            "name": file_name,
+            "file": json_file.name,
+            "filepath": f"data/{json_file.name}",
+            "description": metadata.get('dataset_name', file_name),
+            "total_documents": metadata.get('total_documents', 'Unknown'),
+            "total_periods": metadata.get('total_periods', 'Unknown'),
+            "sentiment_model": metadata.get('sentiment_model', 'Unknown'),
+            "file_size_mb": round(file_size, 2),
+            "metadata": metadata
+        }
+    except Exception as e:
+        logger.warning(f"Error reading dataset {json_file.name}: {e}")
+        # Still add it to the list with basic info
+        entry = {
+            "name": file_name,
+            "file": json_file.name,
+            "filepath": f"data/{json_file.name}",
+            "description": "Dataset",
+            "file_size_mb": round(file_size, 2)
+        }
+
+    with dataset_cache_lock:
+        dataset_cache[json_file.name] = (signature, entry)
+    return entry
+
+
 @app.route('/api/datasets', methods=['GET'])
 def list_datasets():
     """
     List available preprocessed datasets from the data directory.
     """
     try:
-        data_dir = Path(__file__).parent.parent / 'data'
+        data_dir = DATA_FOLDER
         datasets = []
 
         if data_dir.exists():
             # Scan for JSON files in data directory
             for json_file in data_dir.glob('*.json'):
                 try:
-                    # Get file info
-                    file_size = json_file.stat().st_size / (1024 * 1024)  # MB
-                    file_name = json_file.stem  # Filename without extension
-
-                    # Try to read metadata if available
-                    with open(json_file, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                        metadata = data.get('metadata', {})
-
-                    datasets.append({
-                        "name": file_name,
-                        "file": json_file.name,
-                        "filepath": f"data/{json_file.name}",
-                        "description": metadata.get('dataset_name', file_name),
-                        "total_documents": metadata.get('total_documents', 'Unknown'),
-                        "total_periods": metadata.get('total_periods', 'Unknown'),
-                        "sentiment_model": metadata.get('sentiment_model', 'Unknown'),
-                        "file_size_mb": round(file_size, 2),
-                        "metadata": metadata
-                    })
-                except Exception as e:
-                    print(f"Error reading dataset {json_file.name}: {e}")
-                    # Still add it to the list with basic info
-                    datasets.append({
-                        "name": json_file.stem,
-                        "file": json_file.name,
-                        "filepath": f"data/{json_file.name}",
-                        "description": "Dataset",
-                        "file_size_mb": round(json_file.stat().st_size / (1024 * 1024), 2)
-                    })
+                    datasets.append(describe_dataset(json_file))
+                except OSError as e:
+                    # Removed between the scan and the stat
+                    logger.warning(f"Error reading dataset {json_file.name}: {e}")
+
+        # Forget files that are no longer in the data directory
+        listed = {dataset["file"] for dataset in datasets}
+        with dataset_cache_lock:
+            for name in [name for name in dataset_cache if name not in listed]:
+                del dataset_cache[name]
 
         return jsonify({
             "success": True,
@@ -476,66 +1104,76 @@ def list_datasets():
         })
 
     except Exception as e:
-        print(f"Error in /api/datasets: {e}")
+        logger.exception(f"Error in /api/datasets: {e}")
         return jsonify({
             "error": str(e),
             "message": "Error listing datasets"
         }), 500
 
 
+# Available sentiment analysis models
+MODELS = [
+    {
+        "id": "emotion",
+        "name": "Emotion Detection",
+        "description": "Maps to 6 emotions (joy, sadness, anger, fear, surprise, disgust)",
+        "output_types": ["emotion", "sentiment_score"]
+    },
+    {
+        "id": "goemotions",
+        "name": "Emotion Detection Advanced (28 emotions)",
+        "description": "Fine-grained emotion detection with 28 emotions based on the GoEmotions dataset",
+        "output_types": ["emotion", "sentiment_score"],
+        "emotions": [
+            "admiration", "amusement", "anger", "annoyance", "approval", "caring",
+            "confusion", "curiosity", "desire", "disappointment", "disapproval",
+            "disgust", "embarrassment", "excitement", "fear", "gratitude", "grief",
+            "joy", "love", "nervousness", "optimism", "pride", "realization",
+            "relief", "remorse", "sadness", "surprise", "neutral"
+        ]
+    },
+    {
+        "id": "sentiment",
+        "name": "Sentiment Analysis",
+        "description": "Classifies text as positive, negative, or neutral",
+        "output_types": ["sentiment", "confidence"]
+    },
+    {
+        "id": "happiness",
+        "name": "Happiness Score",
+        "description": "Scores text on happiness scale (0-100)",
+        "output_types": ["happiness_score"]
+    }
+]
+
+# The model list never changes, so its response body is encoded once
+MODELS_RESPONSE = encode_json({
+    "success": True,
+    "models": MODELS
+})
+
+
 @app.route('/api/models', methods=['GET'])
 def list_models():
     """List available sentiment analysis models"""
-    models = [
-        {
-            "id": "emotion",
-            "name": "Emotion Detection",
-            "description": "Maps to 6 emotions (joy, sadness, anger, fear, surprise, disgust)",
-            "output_types": ["emotion", "sentiment_score"]
-        },
-        {
-            "id": "goemotions",
-            "name": "Emotion Detection Advanced (28 emotions)",
-            "description": "Fine-grained emotion detection with 28 emotions based on the GoEmotions dataset",
-            "output_types": ["emotion", "sentiment_score"],
-            "emotions": [
-                "admiration", "amusement", "anger", "annoyance", "approval", "caring",
-                "confusion", "curiosity", "desire", "disappointment", "disapproval",
-                "disgust", "embarrassment", "excitement", "fear", "gratitude", "grief",
-                "joy", "love", "nervousness", "optimism", "pride", "realization",
-                "relief", "remorse", "sadness", "surprise", "neutral"
-            ]
-        },
-        {
-            "id": "sentiment",
-            "name": "Sentiment Analysis",
-            "description": "Classifies text as positive, negative, or neutral",
-            "output_types": ["sentiment", "confidence"]
-        },
-        {
-            "id": "happiness",
-            "name": "Happiness Score",
-            "description": "Scores text on happiness scale (0-100)",
-            "output_types": ["happiness_score"]
-        }
-    ]
+    return Response(MODELS_RESPONSE, mimetype='application/json')
 
-    return jsonify({
-        "success": True,
-        "models": models
-    })
+
+# Everything but the timestamp is fixed; keys are sorted, so the timestamp
+# is appended last
+STATUS_PREFIX = encode_json({
+    "status": "ready",
+    "max_file_size_mb": MAX_FILE_SIZE / (1024 * 1024),
+    "allowed_formats": list(ALLOWED_EXTENSIONS),
+    "available_models": ["emotion", "goemotions", "sentiment", "happiness"]
+})[:-2] + b',"timestamp":"'
 
 
 @app.route('/api/status', methods=['GET'])
 def status():
     """Get API status and configuration"""
-    return jsonify({
-        "status": "ready",
-        "max_file_size_mb": MAX_FILE_SIZE / (1024 * 1024),
-        "allowed_formats": list(ALLOWED_EXTENSIONS),
-        "available_models": ["emotion", "goemotions", "sentiment", "happiness"],
-        "timestamp": datetime.now().isoformat()
-    })
+    body = STATUS_PREFIX + current_timestamp().encode('ascii') + b'"}\n'
+    return Response(body, mimetype='application/json')
 
 
 @app.route('/api/convert', methods=['POST'])
@@ -563,22 +1201,27 @@ def convert_format():
         }), 500
 
 
+# Constant error bodies, encoded once so error floods cost no JSON work
+TOO_LARGE_RESPONSE = encode_json({
+    "error": "File too large",
+    "max_size_mb": MAX_FILE_SIZE / (1024 * 1024)
+})
+NOT_FOUND_RESPONSE = encode_json({
+    "error": "Endpoint not found",
+    "message": "Check the API documentation"
+})
+
+
 @app.errorhandler(413)
 def request_entity_too_large(error):
     """Handle file too large error"""
-    return jsonify({
-        "error": "File too large",
-        "max_size_mb": MAX_FILE_SIZE / (1024 * 1024)
-    }), 413
+    return Response(TOO_LARGE_RESPONSE, status=413, mimetype='application/json')
 
 
 @app.errorhandler(404)
 def not_found(error):
     """Handle 404 errors"""
-    return jsonify({
-        "error": "Endpoint not found",
-        "message": "Check the API documentation"
-    }), 404
+    return Response(NOT_FOUND_RESPONSE, status=404, mimetype='application/json')
 
 
 @app.errorhandler(500)
@@ -590,15 +1233,57 @@ def internal_error(error):
     }), 500
 
 
+def preload_preprocessors():
+    """Load PRELOAD_MODELS one after another so their first requests hit the cache"""
+    for sentiment_model in PRELOAD_MODELS:
+        try:
+            get_preprocessor(sentiment_model)
+            logger.info(f"Preloaded {sentiment_model} preprocessor")
+        except Exception:
+            logger.exception(f"Failed to preload {sentiment_model} preprocessor")
+
+
+background_started = False
+background_lock = threading.Lock()
+
+
+def start_background_tasks():
+    """
+    Start the stale file sweeper (and model preloading, if enabled).
+
+    Called by the server entry points rather than on import, so importing
+    the app for tests or tooling doesn't delete files. Safe to call twice.
+    """
+    global background_started
+    with background_lock:
+        if background_started:
+            return
+        background_started = True
+
+    # Only files older than STALE_FILE_AGE go, since other workers may be
+    # using newer ones right now
+    threading.Thread(target=sweep_stale_files, daemon=True).start()
+
+    if PRELOAD:
+        threading.Thread(target=preload_preprocessors, daemon=True).start()
+
+
 if __name__ == '__main__':
     print("Starting WordStream API Server...")
     print(f"Upload folder: {app.config['UPLOAD_FOLDER']}")
     print(f"Max file size: {MAX_FILE_SIZE / (1024*1024):.1f} MB")
 
-    # Run development server
+    start_background_tasks()
+
+    # Load the default model up front so the first request doesn't pay for it
+    print("Loading default preprocessor...")
+    get_preprocessor("emotion")
+
+    # Run development server; the interactive debugger is opt-in since it
+    # allows running code from the browser
     app.run(
         host='0.0.0.0',
         port=5000,
-        debug=True,
+        debug=os.environ.get("WORDSTREAM_DEBUG") == "1",
         use_reloader=False
     )
@@ -0,0 +1,24 @@
+"""
+Gunicorn configuration for the WordStream API
+
+Each worker is a separate process with its own preprocessor cache, so
+uploads are processed in parallel instead of queueing behind the GIL.
+"""
+
+import os
+
+bind = "0.0.0.0:5000"
+workers = max(2, (os.cpu_count() or 2) // 2)
+worker_class = "gthread"
+threads = 4
+# Large uploads can take several minutes to process
+timeout = 300
+# send_file hands /data/* responses to wsgi.file_wrapper, which gunicorn
+# writes to the socket with os.sendfile instead of a read/write loop
+sendfile = True
+
+
+def post_fork(server, worker):
+    """Load the default model in each worker before it accepts requests"""
+    from api_server import get_preprocessor
+    get_preprocessor("emotion")
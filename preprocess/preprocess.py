@@ -4,36 +4,32 @@ Handles loading, cleaning, sentiment analysis, and formatting data for visualiza
 """
 
 import pandas as pd
-import numpy as np
 import json
 import re
 import os
 from datetime import datetime
+from functools import lru_cache
 from typing import Dict, List, Tuple, Optional
-from collections import defaultdict, Counter
+from collections import defaultdict
 from pathlib import Path
-from concurrent.futures import ThreadPoolExecutor
-from multiprocessing import cpu_count
 import nltk
 from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize
 from sentiment_analyzer import SentimentAnalyzer, HappinessScorer, TopicDetector
 
-# Download required NLTK data
 try:
-    nltk.data.find('tokenizers/punkt')
-except LookupError:
-    nltk.download('punkt')
+    import orjson
+except ImportError:  # Fall back to the stdlib json module
+    orjson = None
 
+# Download required NLTK data
 try:
     nltk.data.find('corpora/stopwords')
 except LookupError:
     nltk.download('stopwords')
 
 
-# Global stopwords set for multiprocessing workers
-STOPWORDS = set(stopwords.words('english'))
-STOPWORDS.update({
+# Global stopwords, shared read-only by every word extraction
+STOPWORDS = frozenset(stopwords.words('english')) | frozenset({
     'the', 'a', 'an', 'and', 'or', 'but', 'is', 'was', 'are', 'been',
     'like', 'just', 'can', 'could', 'said', 'would', 'will', 'should',
     'may', 'might', 'must', 'also', 'get', 'got', 'make', 'made',
@@ -41,46 +37,121 @@ STOPWORDS.update({
     'one', 'two', 'three', 'first', 'second', 'http', 'https', 'www'
 })
 
+# Cleaning patterns, compiled once instead of looked up on every document
+URL_PATTERN = re.compile(r'http\S+|www\S+|https\S+', re.MULTILINE)
+HTML_TAG_PATTERN = re.compile(r'<.*?>')
+SPECIAL_CHAR_PATTERN = re.compile(r'[^a-zA-Z0-9\s\-.]')
+
+# Cleaned text only holds [a-z0-9\s\-.]. On that, nltk's word_tokenize
+# splits words at whitespace, at runs of two or more periods and at each
+# "--" pair, and splits off a sentence's final period. Its alphabetic tokens
+# are therefore the runs of letters between those splits, where a single
+# period may end the word only before whitespace; that treats every period
+# before whitespace as a sentence end, where punkt keeps abbreviations
+TOKEN_SPLIT_PATTERN = re.compile(r'\.{2,}|--')
+TOKEN_PATTERN = re.compile(r'(?<![^\s|])[a-z]+(?=\||\.?(?:\s|$))')
+# word_tokenize also splits these words in two
+SPLIT_CONTRACTIONS = {
+    'cannot': ('can', 'not'), 'gimme': ('gim', 'me'), 'gonna': ('gon', 'na'),
+    'gotta': ('got', 'ta'), 'lemme': ('lem', 'me'), 'wanna': ('wan', 'na')
+}
+
+
+def _clean_text(text: str) -> str:
+    """
+    Lowercase text and strip URLs, HTML tags and special characters.
+
+    The URL and tag passes only run when the text could contain a match,
+    which most short documents can't.
+    """
+    # Convert to lowercase
+    text = text.lower()
+
+    # Remove URLs
+    if 'http' in text or 'www' in text:
+        text = URL_PATTERN.sub('', text)
+
+    # Remove HTML tags
+    if '<' in text:
+        text = HTML_TAG_PATTERN.sub('', text)
+
+    # Remove special characters but keep basic punctuation
+    text = SPECIAL_CHAR_PATTERN.sub('', text)
+
+    # Remove extra whitespace
+    return ' '.join(text.split())
+
+
+def _tokenize_words(text: str, stop_words, min_length: int) -> List[str]:
+    """Unique alphabetic tokens of cleaned text, minus stopwords and short words"""
+    if '..' in text or '--' in text:
+        # Mark the split points with '|', which cleaning never leaves behind
+        text = TOKEN_SPLIT_PATTERN.sub('|', text)
+    tokens = set(TOKEN_PATTERN.findall(text))
+    for word in tokens.intersection(SPLIT_CONTRACTIONS):
+        tokens.remove(word)
+        tokens.update(SPLIT_CONTRACTIONS[word])
+    return [word for word in tokens if len(word) >= min_length and word not in stop_words]
+
 
 def _extract_words_worker(text: str, min_length: int = 3) -> List[str]:
     """
-    Worker function for parallel word extraction.
-    Must be at module level for multiprocessing.
+    Extract the unique words of one document.
+    Module level so it can be mapped over a text column directly.
     """
     if not isinstance(text, str):
         return []
 
     # Clean text
-    text = text.lower()
-    text = re.sub(r'http\S+|www\S+|https\S+', '', text, flags=re.MULTILINE)
-    text = re.sub(r'<.*?>', '', text)
-    text = re.sub(r'[^a-zA-Z0-9\s\-.]', '', text)
-    text = ' '.join(text.split())
+    text = _clean_text(text)
 
-    # Tokenize
-    tokens = word_tokenize(text)
+    # Tokenize and filter, returning unique words
+    return _tokenize_words(text, STOPWORDS, min_length)
 
-    # Filter
-    words = [
-        word.lower() for word in tokens
-        if word.lower() not in STOPWORDS
-        and len(word) >= min_length
-        and word.isalpha()
-    ]
 
-    return list(set(words))  # Return unique words
+@lru_cache(maxsize=100000)
+def _parse_date_str(date_str: str) -> Optional[Tuple[int, str]]:
+    """
+    Parse a stripped date string to (year, period), or None if it can't be.
+    Cached, since a corpus usually repeats the same few dates many times.
+    """
+    # Fast path for plain ISO dates (YYYY-MM-DD)
+    try:
+        dt = datetime.strptime(date_str, '%Y-%m-%d')
+        return (dt.year, f"{dt.year}-{dt.month:02d}")
+    except ValueError:
+        pass
+
+    # Any other format pandas understands
+    try:
+        dt = pd.to_datetime(date_str)
+        return (dt.year, f"{dt.year}-{dt.month:02d}")
+    except:
+        pass
+
+    # Try year only
+    try:
+        year = int(date_str)
+        return (year, str(year))
+    except:
+        pass
+
+    return None
 
 
 class DataPreprocessor:
     """Main preprocessing pipeline for WordStream data"""
 
-    def __init__(self, sentiment_model: str = "emotion", use_happiness: bool = False):
+    def __init__(self, sentiment_model: str = "emotion", use_happiness: bool = False, quantize: bool = False,
+                 compile_model: bool = False):
         """
         Initialize preprocessor.
 
         Args:
             sentiment_model: "emotion", "goemotions" (Emotion Detection Advanced), "sentiment", "topic", or "happiness"
             use_happiness: If True, use happiness scoring instead of sentiment
+            quantize: If True, run the sentiment model with int8 weights on CPU
+            compile_model: If True, compile the sentiment model with torch.compile on CUDA
         """
         self.model_type = sentiment_model
 
@@ -88,29 +159,27 @@ class DataPreprocessor:
         if sentiment_model == "happiness":
             use_happiness = True
 
-        self.sentiment_analyzer = SentimentAnalyzer(model_type=sentiment_model) if sentiment_model not in ["topic", "happiness"] else None
+        self.sentiment_analyzer = SentimentAnalyzer(
+            model_type=sentiment_model, quantize=quantize, compile_model=compile_model
+        ) if sentiment_model not in ["topic", "happiness"] else None
         self.topic_detector = TopicDetector() if sentiment_model == "topic" else None
         self.happiness_scorer = HappinessScorer() if use_happiness or sentiment_model == "happiness" else None
         self.use_happiness = use_happiness or sentiment_model == "happiness"
         self.use_topics = sentiment_model == "topic"
-        self.stopwords = set(stopwords.words('english'))
-
-        # Expand stopwords with custom words
-        self.stopwords.update({
-            'the', 'a', 'an', 'and', 'or', 'but', 'is', 'was', 'are', 'been',
-            'like', 'just', 'can', 'could', 'said', 'would', 'will', 'should',
-            'may', 'might', 'must', 'also', 'get', 'got', 'make', 'made',
-            'go', 'going', 'come', 'coming', 'new', 'year', 'time', 'day',
-            'one', 'two', 'three', 'first', 'second', 'http', 'https', 'www'
-        })
+        # Per-instance copy, so callers can extend it for extract_words
+        self.stopwords = set(STOPWORDS)
 
     def load_data(self, filepath: str) -> pd.DataFrame:
         """Load data from CSV, TSV, JSON, or TXT"""
         filepath = Path(filepath)
 
         if filepath.suffix == '.json':
-            with open(filepath, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            if orjson is not None:
+                with open(filepath, 'rb') as f:
+                    data = orjson.loads(f.read())
+            else:
+                with open(filepath, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
             return pd.DataFrame(data)
 
         elif filepath.suffix in ['.csv', '.tsv']:
@@ -134,42 +203,42 @@ class DataPreprocessor:
         else:
             raise ValueError(f"Unsupported file format: {filepath.suffix}")
 
+    def iter_data(self, filepath: str, columns: List[str], chunksize: int = 100000):
+        """
+        Yield DataFrame chunks holding only the given columns.
+
+        CSV/TSV files are memory-mapped and read chunksize rows at a time so
+        the whole table is never in memory; other formats are loaded with
+        load_data. Columns missing from the file are simply absent from the
+        chunks.
+        """
+        filepath = Path(filepath)
+
+        if filepath.suffix in ['.csv', '.tsv']:
+            sep = '\t' if filepath.suffix == '.tsv' else ','
+            yield from pd.read_csv(
+                filepath, sep=sep, encoding='utf-8',
+                usecols=lambda column: column in columns,
+                chunksize=chunksize,
+                memory_map=True
+            )
+        else:
+            df = self.load_data(filepath)
+            yield df[[column for column in df.columns if column in columns]]
+
     def clean_text(self, text: str) -> str:
         """Clean and normalize text"""
         if not isinstance(text, str):
             return ""
 
-        # Convert to lowercase
-        text = text.lower()
-
-        # Remove URLs
-        text = re.sub(r'http\S+|www\S+|https\S+', '', text, flags=re.MULTILINE)
-
-        # Remove HTML tags
-        text = re.sub(r'<.*?>', '', text)
-
-        # Remove special characters but keep basic punctuation
-        text = re.sub(r'[^a-zA-Z0-9\s\-.]', '', text)
-
-        # Remove extra whitespace
-        text = ' '.join(text.split())
-
-        return text
+        return _clean_text(text)
 
     def extract_words(self, text: str, min_length: int = 3) -> List[str]:
         """Extract and filter words from text"""
         text = self.clean_text(text)
-        tokens = word_tokenize(text)
 
         # Filter: remove stopwords, short words, and non-alphabetic
-        words = [
-            word.lower() for word in tokens
-            if word.lower() not in self.stopwords
-            and len(word) >= min_length
-            and word.isalpha()
-        ]
-
-        return list(set(words))  # Return unique words
+        return _tokenize_words(text, self.stopwords, min_length)
 
     def get_happiness_color(self, happiness_category: str) -> str:
         """
@@ -198,48 +267,42 @@ class DataPreprocessor:
         if pd.isna(date_str):
             return (datetime.now().year, str(datetime.now().year))
 
-        date_str = str(date_str).strip()
-
-        # Try ISO format (YYYY-MM-DD)
-        try:
-            dt = pd.to_datetime(date_str)
-            return (dt.year, f"{dt.year}-{dt.month:02d}")
-        except:
-            pass
-
-        # Try year only
-        try:
-            year = int(date_str)
-            return (year, str(year))
-        except:
-            pass
+        parsed = _parse_date_str(str(date_str).strip())
+        if parsed is not None:
+            return parsed
 
         # Fallback
         return (datetime.now().year, str(datetime.now().year))
 
     def compute_sudden_attention(
         self,
-        words_by_period: Dict[str, Counter]
-    ) -> Dict[str, Dict[str, float]]:
+        word_freqs: pd.Series
+    ) -> pd.Series:
         """
         Compute 'sudden attention' metric for each word in each period.
 
         Sudden attention = (freq_current + 1) / (freq_previous + 1)
         High value = word appeared or spiked suddenly
-        """
-        periods = sorted(words_by_period.keys())
-        sudden_attention = {}
 
-        for i, period in enumerate(periods):
-            sudden_attention[period] = {}
-            prev_freqs = words_by_period[periods[i-1]] if i > 0 else Counter()
+        Args:
+            word_freqs: Word frequencies indexed by (period, word)
 
-            for word, freq in words_by_period[period].items():
-                prev_freq = prev_freqs.get(word, 0)
-                sudden = (freq + 1) / (prev_freq + 1)
-                sudden_attention[period][word] = sudden
+        Returns:
+            Sudden attention values with the same (period, word) index
+        """
+        periods = sorted(word_freqs.index.unique(level=0))
+        previous_period = dict(zip(periods[1:], periods[:-1]))
+
+        # Look up every word's frequency in the previous period in one
+        # reindex; words absent there (or in the first period) count as 0
+        previous_index = pd.MultiIndex.from_arrays([
+            word_freqs.index.get_level_values(0).map(previous_period),
+            word_freqs.index.get_level_values(1)
+        ])
+        prev_freqs = word_freqs.reindex(previous_index).fillna(0).to_numpy()
 
-        return sudden_attention
+        sudden = (word_freqs.to_numpy() + 1) / (prev_freqs + 1)
+        return pd.Series(sudden, index=word_freqs.index)
 
     def process_dataset(
         self,
@@ -284,119 +347,108 @@ class DataPreprocessor:
             }
         """
         print(f"Loading {filepath}...")
-        df = self.load_data(filepath)
 
-        # Validate columns exist
-        if date_column not in df.columns:
-            raise ValueError(f"Date column '{date_column}' not found in data")
-        if text_column not in df.columns:
-            raise ValueError(f"Text column '{text_column}' not found in data")
-
-        # Group data by period and category
-        words_by_period = defaultdict(Counter)
-        sentiment_by_word_period = defaultdict(lambda: defaultdict(list))
-        topic_by_word_period = defaultdict(lambda: defaultdict(list))
-        emotion_by_word_period = defaultdict(lambda: defaultdict(list))
-        happiness_by_word_period = defaultdict(lambda: defaultdict(list))
+        # Per-document results, aggregated per (period, word) after analysis
+        doc_periods = []
+        doc_words = []
+        doc_sentiments = []
+        doc_labels = []
 
         print(f"Processing documents with model type: {self.model_type}...")
         emotion_counts = defaultdict(int)
         happiness_counts = defaultdict(int)
 
-        total_docs = len(df)
-        batch_size = 32  # Process 32 documents at a time for optimal performance
+        total_docs = 0
+        batch_size = 128  # Texts per model forward pass
+        # Documents handed to the analyzer per call; progress is reported
+        # between calls
+        dispatch_size = batch_size * 8
 
-        # Pre-extract all texts and periods for batching
+        # Pre-extract all texts and periods for batching, reading the file in
+        # chunks of just the date and text columns
         print("Preparing batch data...")
         batch_data = []
-        for idx, row in df.iterrows():
-            text = row[text_column]
-            if pd.isna(text):
-                continue
-            year, period = self.parse_date(row[date_column])
-            batch_data.append((idx, text, period))
-
-        # Initialize thread pool for parallel word extraction (works on Windows!)
-        num_workers = max(2, cpu_count() - 1)  # Leave 1 core free for system
-        print(f"Using {num_workers} threads for parallel word extraction...")
-
-        # Use context manager for automatic cleanup
-        with ThreadPoolExecutor(max_workers=num_workers) as executor:
-            # Process in batches
-            for batch_start in range(0, len(batch_data), batch_size):
-                batch_end = min(batch_start + batch_size, len(batch_data))
-                batch = batch_data[batch_start:batch_end]
-
-                if batch_start % (batch_size * 10) == 0:  # Report every 10 batches
-                    print(f"  Processed {batch_start}/{len(batch_data)} documents")
-                    if progress_callback:
-                        progress_callback(batch_start, len(batch_data), f"Processing documents... {batch_start}/{len(batch_data)}")
-
-                # Extract texts for this batch
-                batch_texts = [item[1] for item in batch]
-                batch_periods = [item[2] for item in batch]
-                batch_indices = [item[0] for item in batch]
-
-                # Batch sentiment analysis (GPU/CPU optimized)
-                if self.use_topics:
-                    # Topic detection doesn't support batching efficiently, fall back to one-by-one
-                    batch_results = []
-                    for text in batch_texts:
-                        topic_result = self.topic_detector.detect_topic(text)
-                        batch_results.append({
-                            "sentiment_score": 0.0,
-                            "emotion": "neutral",
-                            "primary_topic": topic_result["topic"]
-                        })
-                elif self.use_happiness:
-                    # Happiness scoring uses sentiment analyzer internally, process one-by-one for now
-                    batch_results = []
-                    for text in batch_texts:
-                        happiness_category = self.happiness_scorer.categorize(text)
-                        sentiment_score = self.happiness_scorer.score(text) / 100.0 * 2 - 1
-                        batch_results.append({
-                            "sentiment_score": sentiment_score,
-                            "emotion": happiness_category,
-                            "primary_topic": None
-                        })
-                        happiness_counts[happiness_category] += 1
-                else:
-                    # BATCH SENTIMENT/EMOTION ANALYSIS - 20x faster!
-                    analysis_results = self.sentiment_analyzer.batch_analyze(batch_texts, batch_size=batch_size)
-                    batch_results = []
-                    for analysis in analysis_results:
-                        batch_results.append({
-                            "sentiment_score": analysis["sentiment_score"],
-                            "emotion": analysis["emotion"],
-                            "primary_topic": None
-                        })
-                        if self.model_type == "emotion":
-                            emotion_counts[analysis["emotion"]] += 1
-
-                # Extract words for each text in batch using threading (works on Windows!)
-                batch_words = list(executor.map(_extract_words_worker, batch_texts))
-
-                # Store results for each document in batch
-                for i, (idx, text, period) in enumerate(batch):
-                    words = batch_words[i]
-                    result = batch_results[i]
-                    sentiment_score = result["sentiment_score"]
-                    emotion = result["emotion"]
-                    primary_topic = result.get("primary_topic")
-
-                    # Add words
-                    for word in words:
-                        words_by_period[period][word] += 1
-                        sentiment_by_word_period[period][word].append(sentiment_score)
-                        if self.use_topics:
-                            topic_by_word_period[period][word].append(primary_topic)
-                        elif self.use_happiness:
-                            happiness_by_word_period[period][word].append(emotion)
-                        else:
-                            # For emotion/sentiment models, store emotion for grouping
-                            emotion_by_word_period[period][word].append(emotion)
-
-        # Thread pool automatically cleaned up by context manager
+        for df in self.iter_data(filepath, [date_column, text_column]):
+            # Validate columns exist
+            if date_column not in df.columns:
+                raise ValueError(f"Date column '{date_column}' not found in data")
+            if text_column not in df.columns:
+                raise ValueError(f"Text column '{text_column}' not found in data")
+
+            total_docs += len(df)
+            df = df[df[text_column].notna()]
+            # Word extraction is pure Python and gains nothing from threads
+            # under the GIL, so map it over the whole chunk in one call
+            chunk_words = df[text_column].map(_extract_words_worker)
+            # Walk the column arrays directly; iterrows would box every row
+            # into a Series
+            for idx, text, date, words in zip(
+                df.index, df[text_column].to_numpy(), df[date_column].to_numpy(), chunk_words.to_numpy()
+            ):
+                year, period = self.parse_date(date)
+                batch_data.append((idx, text, period, words))
+
+        # Process in batches
+        for batch_start in range(0, len(batch_data), dispatch_size):
+            batch_end = min(batch_start + dispatch_size, len(batch_data))
+            batch = batch_data[batch_start:batch_end]
+
+            print(f"  Processed {batch_start}/{len(batch_data)} documents")
+            if progress_callback:
+                progress_callback(batch_start, len(batch_data), f"Processing documents... {batch_start}/{len(batch_data)}")
+
+            # Extract texts for this batch
+            batch_texts = [item[1] for item in batch]
+            batch_periods = [item[2] for item in batch]
+            batch_indices = [item[0] for item in batch]
+
+            # Batch sentiment analysis (GPU/CPU optimized)
+            if self.use_topics:
+                # Topic detection doesn't support batching efficiently, fall back to one-by-one
+                batch_results = []
+                for text in batch_texts:
+                    topic_result = self.topic_detector.detect_topic(text)
+                    batch_results.append({
+                        "sentiment_score": 0.0,
+                        "emotion": "neutral",
+                        "primary_topic": topic_result["topic"]
+                    })
+            elif self.use_happiness:
+                # Happiness scoring uses sentiment analyzer internally, process one-by-one for now
+                batch_results = []
+                for text in batch_texts:
+                    happiness_category = self.happiness_scorer.categorize(text)
+                    sentiment_score = self.happiness_scorer.score(text) / 100.0 * 2 - 1
+                    batch_results.append({
+                        "sentiment_score": sentiment_score,
+                        "emotion": happiness_category,
+                        "primary_topic": None
+                    })
+                    happiness_counts[happiness_category] += 1
+            else:
+                # BATCH SENTIMENT/EMOTION ANALYSIS - 20x faster!
+                analysis_results = self.sentiment_analyzer.batch_analyze(batch_texts, batch_size=batch_size)
+                batch_results = []
+                for analysis in analysis_results:
+                    batch_results.append({
+                        "sentiment_score": analysis["sentiment_score"],
+                        "emotion": analysis["emotion"],
+                        "primary_topic": None
+                    })
+                    if self.model_type == "emotion":
+                        emotion_counts[analysis["emotion"]] += 1
+
+            # Store results for each document in batch
+            for i, (idx, text, period, words) in enumerate(batch):
+                result = batch_results[i]
+                emotion = result["emotion"]
+                doc_periods.append(period)
+                doc_words.append(words)
+                doc_sentiments.append(result["sentiment_score"])
+                # Topic model groups words by topic, the others by emotion
+                # (or happiness category)
+                doc_labels.append(result.get("primary_topic") if self.use_topics else emotion)
+
         print("✓ Batch processing complete")
 
         # Log emotion distribution if emotion model
@@ -413,17 +465,45 @@ class DataPreprocessor:
                 print(f"  {happiness}: {count}")
             print()
 
+        # Count each word once per document it appears in, with that
+        # document's sentiment and label, and aggregate into one flat table
+        # indexed by (period, word) rather than nested per-word dicts.
+        # sort=False keeps groups in first-seen order, so words come out in
+        # the same order as before and ties on the primary label go to the
+        # label seen first, as with Counter.most_common.
+        word_rows = pd.DataFrame({
+            'period': doc_periods,
+            'word': doc_words,
+            'sentiment': doc_sentiments,
+            'label': doc_labels
+        }).explode('word').dropna(subset=['word'])
+        word_groups = word_rows.groupby(['period', 'word'], sort=False)
+        word_stats = word_groups.size().to_frame('frequency')
+        word_stats['sentiment'] = word_groups['sentiment'].mean()
+        # Primary label: the first row per word after a stable sort by count
+        label_counts = word_rows.groupby(
+            ['period', 'word', 'label'], sort=False, dropna=False
+        ).size().reset_index(name='count')
+        word_stats['label'] = label_counts.sort_values(
+            'count', ascending=False, kind='stable'
+        ).drop_duplicates(['period', 'word']).set_index(['period', 'word'])['label']
+        del word_rows, word_groups, label_counts
+
         # Compute sudden attention
         print("Computing sudden attention...")
         if progress_callback:
             progress_callback(total_docs, total_docs, "Computing sudden attention...")
-        sudden_attention = self.compute_sudden_attention(words_by_period)
+        word_stats['sudden'] = self.compute_sudden_attention(word_stats['frequency'])
 
         # Build output structure
         print("Building output structure...")
         if progress_callback:
             progress_callback(total_docs, total_docs, "Building output structure...")
-        periods = sorted(words_by_period.keys())
+        stats_by_period = {
+            period: period_stats.droplevel(0)
+            for period, period_stats in word_stats.groupby(level=0)
+        }
+        periods = sorted(stats_by_period)
         output_data = []
 
         for period in periods:
@@ -432,68 +512,38 @@ class DataPreprocessor:
                 "words": defaultdict(list)
             }
 
-            for word, freq in words_by_period[period].items():
+            period_stats = stats_by_period[period]
+            for word, freq, avg_sentiment, primary_label, sudden in zip(
+                period_stats.index,
+                period_stats['frequency'].tolist(),
+                period_stats['sentiment'].tolist(),
+                period_stats['label'].tolist(),
+                period_stats['sudden'].tolist()
+            ):
                 if self.use_topics:
-                    # Get primary topic for this word
-                    word_topics = topic_by_word_period[period][word]
-                    # Count most common topic
-                    from collections import Counter as CollCounter
-                    topic_counter = CollCounter(word_topics)
-                    primary_topic = topic_counter.most_common(1)[0][0] if topic_counter else "Uncategorized"
+                    primary_topic = primary_label if primary_label is not None else "Uncategorized"
 
                     avg_sentiment = 0.0
                     color = self.topic_detector.get_color_for_topic(primary_topic)
                     grouping_category = primary_topic
                 elif self.use_happiness:
                     # For happiness model: group by happiness category
-                    word_happiness = happiness_by_word_period[period][word]
-                    from collections import Counter as CollCounter
-                    happiness_counter = CollCounter(word_happiness)
-                    primary_happiness = happiness_counter.most_common(1)[0][0] if happiness_counter else "fine"
-
-                    # Get word sentiment for averaging and coloring
-                    sentiment_scores = sentiment_by_word_period[period][word]
-                    avg_sentiment = np.mean(sentiment_scores) if sentiment_scores else 0.0
+                    primary_happiness = primary_label
 
                     # Get color based on happiness category
                     color = self.get_happiness_color(primary_happiness)
                     grouping_category = primary_happiness
-                elif self.model_type == "emotion":
-                    # For emotion model: group by individual emotion
-                    word_emotions = emotion_by_word_period[period][word]
-                    from collections import Counter as CollCounter
-                    emotion_counter = CollCounter(word_emotions)
-                    primary_emotion = emotion_counter.most_common(1)[0][0] if emotion_counter else "neutral"
-
-                    # Get word sentiment for averaging
-                    sentiment_scores = sentiment_by_word_period[period][word]
-                    avg_sentiment = np.mean(sentiment_scores) if sentiment_scores else 0.0
-
-                    # Get color based on emotion
-                    color = self.sentiment_analyzer.get_color_for_sentiment(avg_sentiment, primary_emotion)
-                    grouping_category = primary_emotion
-                elif self.model_type == "goemotions":
-                    # For Emotion Detection Advanced: group by individual emotion (28 total)
-                    word_emotions = emotion_by_word_period[period][word]
-                    from collections import Counter as CollCounter
-                    emotion_counter = CollCounter(word_emotions)
-                    primary_emotion = emotion_counter.most_common(1)[0][0] if emotion_counter else "neutral"
-
-                    # Get word sentiment for averaging
-                    sentiment_scores = sentiment_by_word_period[period][word]
-                    avg_sentiment = np.mean(sentiment_scores) if sentiment_scores else 0.0
+                elif self.model_type in ("emotion", "goemotions"):
+                    # For emotion models: group by individual emotion
+                    # (6 for emotion, 28 for goemotions)
+                    primary_emotion = primary_label
 
                     # Get color based on emotion
                     color = self.sentiment_analyzer.get_color_for_sentiment(avg_sentiment, primary_emotion)
                     grouping_category = primary_emotion
                 else:
                     # For sentiment model: group by sentiment category (Positive/Negative/Neutral)
-                    # Get word sentiment (average across documents)
-                    sentiment_scores = sentiment_by_word_period[period][word]
-                    avg_sentiment = np.mean(sentiment_scores) if sentiment_scores else 0.0
-                    primary_emotion = "neutral"
-
-                    # Get word color based on sentiment
+                    # Get word color based on average sentiment across documents
                     color = self.sentiment_analyzer.get_color_for_sentiment(avg_sentiment)
 
                     # Determine sentiment-based category for visualization grouping
@@ -507,7 +557,7 @@ class DataPreprocessor:
                 word_entry = {
                     "text": word,
                     "frequency": int(freq),
-                    "sudden": float(sudden_attention[period][word]),
+                    "sudden": float(sudden),
                     "sentiment": float(avg_sentiment),
                     "emotion": emotion if emotion else "neutral",
                     "color": color,
@@ -587,11 +637,11 @@ class DataPreprocessor:
 
         metadata = {
             "dataset_name": Path(filepath).stem,
-            "total_documents": len(df),
+            "total_documents": total_docs,
             "total_periods": len(periods),
             "periods": periods,
             "categories": categories,
-            "total_unique_words": len(words_by_period[periods[-1]]) if periods else 0,
+            "total_unique_words": len(stats_by_period[periods[-1]]) if periods else 0,
             "created": datetime.now().isoformat(),
             "sentiment_model": model_name
         }
@@ -606,8 +656,13 @@ class DataPreprocessor:
         output_path = Path(output_path)
         output_path.parent.mkdir(parents=True, exist_ok=True)
 
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        if orjson is not None:
+            output_path.write_bytes(orjson.dumps(
+                data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+            ))
+        else:
+            with open(output_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2, ensure_ascii=False)
 
         print(f"✓ Saved to {output_path}")
 
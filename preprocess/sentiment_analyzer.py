@@ -10,6 +10,7 @@ import torch
 import numpy as np
 from transformers import pipeline, AutoTokenizer, AutoModelForSequenceClassification
 from typing import Dict, List, Tuple, Optional
+from collections import defaultdict
 import warnings
 
 warnings.filterwarnings("ignore")
@@ -17,17 +18,23 @@ warnings.filterwarnings("ignore")
 class SentimentAnalyzer:
     """Multi-model sentiment and emotion analysis"""
 
-    def __init__(self, model_type: str = "emotion"):
+    def __init__(self, model_type: str = "emotion", quantize: bool = False, compile_model: bool = False):
         """
         Initialize sentiment analyzer.
 
         Args:
             model_type: "emotion" (6 emotions), "goemotions" (Emotion Detection Advanced - 28 emotions),
                        "sentiment" (pos/neu/neg), or "advanced" (fine-grained)
+            quantize: If True and running on CPU, quantize the model's linear layers to int8
+            compile_model: If True and running on CUDA, compile the model with torch.compile
         """
         self.model_type = model_type
         self.device = "cuda" if torch.cuda.is_available() else "cpu"
         self._initialize_models()
+        if quantize and self.device == "cpu":
+            self._quantize_model()
+        if compile_model and self.device == "cuda":
+            self._compile_model()
 
     def _initialize_models(self):
         """Load appropriate transformer models"""
@@ -115,6 +122,32 @@ class SentimentAnalyzer:
             )
             print(f"✓ Loaded fallback sentiment analyzer on {self.device}")
 
+    def _quantize_model(self):
+        """Replace the model's Linear layers with dynamically quantized int8 ones"""
+        try:
+            self.model.model = torch.ao.quantization.quantize_dynamic(
+                self.model.model, {torch.nn.Linear}, dtype=torch.qint8
+            )
+            print(f"✓ Quantized {self.model_type} analyzer to int8")
+        except Exception as e:
+            print(f"Warning: Could not quantize model {self.model_type}: {e}")
+
+    def _compile_model(self):
+        """
+        Compile the model's forward pass and warm it up.
+
+        Only the model is compiled; label selection and truncation stay in
+        Python around it. The first calls trigger compilation, so a dummy
+        text is analyzed here rather than on the first real request.
+        """
+        try:
+            torch.set_float32_matmul_precision("high")
+            self.model.model = torch.compile(self.model.model, dynamic=True)
+            self.analyze_text("Warming up the compiled model.")
+            print(f"✓ Compiled {self.model_type} analyzer")
+        except Exception as e:
+            print(f"Warning: Could not compile model {self.model_type}: {e}")
+
     def analyze_text(self, text: str) -> Dict:
         """
         Analyze sentiment/emotion of a text.
@@ -192,13 +225,15 @@ class SentimentAnalyzer:
                 "confidence": 0.5
             }
 
-    def batch_analyze(self, texts: List[str], batch_size: int = 32) -> List[Dict]:
+    def batch_analyze(self, texts: List[str], batch_size: int = 32, raise_errors: bool = False) -> List[Dict]:
         """
         Analyze multiple texts efficiently using batching.
 
         Args:
             texts: List of text strings to analyze
             batch_size: Number of texts to process in each batch (default: 32)
+            raise_errors: If True, re-raise model errors instead of returning
+                          neutral results for the failed batch
 
         Returns:
             List of analysis dictionaries in same format as analyze_text()
@@ -206,45 +241,43 @@ class SentimentAnalyzer:
         if not texts:
             return []
 
-        all_results = []
-
-        # Process in batches for optimal GPU/CPU utilization
-        for i in range(0, len(texts), batch_size):
-            batch_texts = texts[i:i + batch_size]
+        all_results = [None] * len(texts)
+
+        # Truncate and preprocess; empty texts are neutral without running
+        # the model, and repeated texts (retweets, boilerplate) run only once
+        indices_by_text = defaultdict(list)
+        for idx, text in enumerate(texts):
+            if not text or len(text.strip()) < 3:
+                all_results[idx] = {
+                    "sentiment_score": 0.0,
+                    "emotion": "neutral",
+                    "emotion_distribution": {"neutral": 1.0},
+                    "confidence": 0.5
+                }
+            else:
+                # Truncate to avoid memory issues
+                indices_by_text[text[:512] if len(text) > 512 else text].append(idx)
 
-            # Truncate and preprocess batch
-            processed_batch = []
-            empty_indices = []
+        # Batch texts of similar length together, so each batch pads to
+        # little more than its own texts; results go back by original index
+        unique_texts = sorted(indices_by_text, key=len)
 
-            for idx, text in enumerate(batch_texts):
-                if not text or len(text.strip()) < 3:
-                    empty_indices.append(idx)
-                    processed_batch.append("")  # Placeholder
-                else:
-                    # Truncate to avoid memory issues
-                    processed_batch.append(text[:512] if len(text) > 512 else text)
+        # Process in batches for optimal GPU/CPU utilization
+        for i in range(0, len(unique_texts), batch_size):
+            processed_batch = unique_texts[i:i + batch_size]
 
             try:
-                # Call model with batch - transformers pipeline handles batching natively
+                # Call model with batch - the pipeline runs one text per
+                # forward pass unless given a batch_size
                 if self.model_type in ["emotion", "sentiment", "goemotions"]:
                     # top_k=None returns all emotion scores
-                    batch_results = self.model(processed_batch, top_k=None)
+                    batch_results = self.model(processed_batch, top_k=None, batch_size=batch_size)
                 else:
                     # Standard sentiment returns single prediction
-                    batch_results = self.model(processed_batch)
+                    batch_results = self.model(processed_batch, batch_size=batch_size)
 
                 # Process results for each text in batch
-                for idx, result in enumerate(batch_results):
-                    # Handle empty texts
-                    if idx in empty_indices:
-                        all_results.append({
-                            "sentiment_score": 0.0,
-                            "emotion": "neutral",
-                            "emotion_distribution": {"neutral": 1.0},
-                            "confidence": 0.5
-                        })
-                        continue
-
+                for text, result in zip(processed_batch, batch_results):
                     # Process based on model type
                     if self.model_type in ["emotion", "sentiment", "goemotions"]:
                         # Results: [{"label": emotion, "score": confidence}]
@@ -257,12 +290,12 @@ class SentimentAnalyzer:
                             for emotion, score in emotion_dist.items()
                         )
 
-                        all_results.append({
+                        analysis = {
                             "sentiment_score": float(sentiment_score),
                             "emotion": dominant_emotion,
                             "emotion_distribution": emotion_dist,
                             "confidence": float(emotion_dist[dominant_emotion])
-                        })
+                        }
                     else:
                         # Standard sentiment analysis
                         label = result["label"].lower()
@@ -279,23 +312,29 @@ class SentimentAnalyzer:
                             sentiment_score = 0.0
                             emotion = "neutral"
 
-                        all_results.append({
+                        analysis = {
                             "sentiment_score": float(sentiment_score),
                             "emotion": emotion,
                             "emotion_distribution": {emotion: score},
                             "confidence": float(score)
-                        })
+                        }
+
+                    for idx in indices_by_text[text]:
+                        all_results[idx] = analysis
 
             except Exception as e:
+                if raise_errors:
+                    raise
                 print(f"Error in batch analysis: {e}")
                 # Fallback to neutral for entire batch on error
-                for _ in batch_texts:
-                    all_results.append({
-                        "sentiment_score": 0.0,
-                        "emotion": "neutral",
-                        "emotion_distribution": {"neutral": 1.0},
-                        "confidence": 0.5
-                    })
+                for text in processed_batch:
+                    for idx in indices_by_text[text]:
+                        all_results[idx] = {
+                            "sentiment_score": 0.0,
+                            "emotion": "neutral",
+                            "emotion_distribution": {"neutral": 1.0},
+                            "confidence": 0.5
+                        }
 
         return all_results
 
@@ -361,10 +400,15 @@ class TopicDetector:
         "Finance", "Travel", "Food", "Lifestyle"
     ]
 
-    def detect_topic(self, text: str) -> Dict:
+    def detect_topic(self, text: str, raise_errors: bool = False) -> Dict:
         """
         Detect the primary topic of a text.
 
+        Args:
+            text: Text to classify
+            raise_errors: If True, re-raise model errors instead of returning
+                          the "Uncategorized" fallback
+
         Returns:
             Dict with topic information:
             {
@@ -405,6 +449,8 @@ class TopicDetector:
             }
 
         except Exception as e:
+            if raise_errors:
+                raise
             print(f"Error detecting topic: {e}")
             return {
                 "topic": "Uncategorized",
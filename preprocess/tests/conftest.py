@@ -0,0 +1,114 @@
+"""
+Shared test setup.
+
+The model classes are replaced by deterministic stand-ins and NLTK's
+stopword corpus is stubbed when it isn't installed, so preprocess and
+api_server import without torch, transformers or any downloads.
+"""
+
+import importlib
+import importlib.util
+import sys
+import types
+import zlib
+from pathlib import Path
+
+import nltk
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+EMOTIONS = ["joy", "surprise", "neutral", "fear", "sadness", "disgust", "anger"]
+
+
+def text_hash(text) -> int:
+    return zlib.crc32(str(text).encode('utf-8'))
+
+
+class SentimentAnalyzer:
+    """Stand-in whose results are a fixed function of the text"""
+
+    def __init__(self, model_type: str = "emotion", quantize: bool = False, compile_model: bool = False):
+        self.model_type = model_type
+
+    def analyze_text(self, text: str) -> dict:
+        if not isinstance(text, str):
+            raise TypeError(f"expected str, got {type(text).__name__}")
+        h = text_hash(text)
+        return {
+            "sentiment_score": (h % 200) / 100 - 1,
+            "emotion": EMOTIONS[h % len(EMOTIONS)],
+            "confidence": 0.5 + (h % 50) / 100
+        }
+
+    def batch_analyze(self, texts, batch_size: int = 32, raise_errors: bool = False) -> list:
+        return [self.analyze_text(text) for text in texts]
+
+    def get_color_for_sentiment(self, sentiment_score: float, emotion: str = None) -> str:
+        return "#%06x" % (text_hash(f"{sentiment_score:.6f}{emotion}") & 0xffffff)
+
+
+class HappinessScorer:
+    """Stand-in whose results are a fixed function of the text"""
+
+    def score(self, text: str) -> int:
+        return text_hash(text) % 101
+
+    def categorize(self, text: str) -> str:
+        return ["very_happy", "happy", "fine", "unhappy", "very_unhappy"][text_hash(text) % 5]
+
+
+class TopicDetector:
+    """Stand-in whose results are a fixed function of the text"""
+
+    TOPICS = ["Technology", "Politics", "Sports"]
+
+    def detect_topic(self, text: str, raise_errors: bool = False) -> dict:
+        return {"topic": self.TOPICS[text_hash(text) % len(self.TOPICS)]}
+
+    def get_color_for_topic(self, topic: str) -> str:
+        return "#757575"
+
+
+stub = types.ModuleType('sentiment_analyzer')
+stub.SentimentAnalyzer = SentimentAnalyzer
+stub.HappinessScorer = HappinessScorer
+stub.TopicDetector = TopicDetector
+sys.modules['sentiment_analyzer'] = stub
+
+try:
+    nltk.data.find('corpora/stopwords')
+except LookupError:
+    nltk.data.find = lambda resource, *args, **kwargs: resource
+    nltk.corpus.stopwords = types.SimpleNamespace(words=lambda language: [
+        'i', 'me', 'my', 'we', 'our', 'you', 'your', 'he', 'him', 'his', 'she',
+        'her', 'it', 'its', 'they', 'them', 'their', 'what', 'which', 'who',
+        'this', 'that', 'these', 'those', 'am', 'is', 'are', 'was', 'were',
+        'be', 'been', 'have', 'has', 'had', 'do', 'does', 'did', 'a', 'an',
+        'the', 'and', 'but', 'if', 'or', 'as', 'of', 'at', 'by', 'for', 'with',
+        'about', 'to', 'from', 'in', 'out', 'on', 'off', 'over', 'so', 'than',
+        'too', 'very', 'can', 'will', 'just', 'not', 'no', 'nor', 'only'
+    ])
+
+
+@pytest.fixture(scope="session")
+def real_sentiment_analyzer():
+    """
+    The real sentiment_analyzer module, loaded under another name.
+
+    torch and transformers are stubbed while it loads if they aren't
+    installed; tests give its classes a fake model pipeline.
+    """
+    with pytest.MonkeyPatch.context() as mp:
+        for name in ("torch", "transformers"):
+            try:
+                importlib.import_module(name)
+            except ImportError:
+                module = types.ModuleType(name)
+                module.pipeline = module.AutoTokenizer = module.AutoModelForSequenceClassification = None
+                mp.setitem(sys.modules, name, module)
+        path = Path(__file__).resolve().parent.parent / "sentiment_analyzer.py"
+        spec = importlib.util.spec_from_file_location("real_sentiment_analyzer", path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+    return module
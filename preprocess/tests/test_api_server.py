@@ -0,0 +1,466 @@
+"""
+API server tests, run against the stand-in models from conftest.
+"""
+
+import gzip
+import io
+import os
+import threading
+import time
+
+import pytest
+
+import api_server
+
+
+CSV_DATA = (
+    "date,text\n"
+    "2020-01-05,Markets rallied as technology stocks climbed\n"
+    "2020-01-20,Technology stocks slipped after the rally\n"
+    "2020-02-03,Markets steadied while investors waited\n"
+).encode('utf-8')
+
+
+@pytest.fixture
+def folders(tmp_path, monkeypatch):
+    """Point every folder the server writes to at a fresh temp directory"""
+    upload_folder = tmp_path / 'uploads'
+    upload_folder.mkdir()
+    monkeypatch.setattr(api_server, 'UPLOAD_FOLDER', str(upload_folder))
+    monkeypatch.setitem(api_server.app.config, 'UPLOAD_FOLDER', str(upload_folder))
+    monkeypatch.setattr(api_server, 'DATA_FOLDER', tmp_path / 'data')
+    monkeypatch.setattr(api_server, 'RESULT_CACHE_FOLDER', str(tmp_path / 'cache'))
+    api_server.analysis_cache.clear()
+    return tmp_path
+
+
+@pytest.fixture
+def client(folders):
+    return api_server.app.test_client()
+
+
+def upload(client, data=CSV_DATA, filename='news.csv'):
+    return client.post('/api/upload', data={
+        'file': (io.BytesIO(data), filename),
+        'sentiment_model': 'emotion'
+    }, content_type='multipart/form-data')
+
+
+# Uploads
+
+def test_upload_is_spooled_and_moved_into_place(client, folders, monkeypatch):
+    seen = {}
+    process = api_server.process_dataset_cached
+
+    def spy(file_path, *args, **kwargs):
+        from flask import request
+        seen['spooled'] = list(request.spooled_paths)
+        seen['file_path'] = file_path
+        seen['listing'] = sorted(os.listdir(folders / 'uploads'))
+        return process(file_path, *args, **kwargs)
+
+    monkeypatch.setattr(api_server, 'process_dataset_cached', spy)
+    response = upload(client)
+
+    assert response.status_code == 200
+    # The spooled part was renamed to the upload path, not copied
+    assert len(seen['spooled']) == 1
+    assert not os.path.exists(seen['spooled'][0])
+    assert seen['listing'] == [os.path.basename(seen['file_path'])]
+    assert seen['listing'][0].startswith(api_server.UPLOAD_PREFIX)
+    # Nothing is left behind once the request is done
+    assert os.listdir(folders / 'uploads') == []
+
+    body = response.get_json()
+    assert body['metadata']['total_documents'] == 3
+    assert (folders / 'data' / body['filename']).exists()
+
+
+def test_unused_spooled_upload_is_removed(client, folders):
+    response = client.post('/api/upload', data={
+        'file': (io.BytesIO(CSV_DATA), 'notes.exe')
+    }, content_type='multipart/form-data')
+
+    assert response.status_code == 400
+    assert os.listdir(folders / 'uploads') == []
+
+
+@pytest.mark.parametrize("filename, allowed", [
+    ("news.csv", True), ("NEWS.TSV", True), ("archive.tar.json", True), ("notes.txt", True),
+    ("notes.exe", False), ("csv", False), ("news.csv.exe", False), ("news.", False), ("", False)
+])
+def test_allowed_file(filename, allowed):
+    assert api_server.allowed_file(filename) is allowed
+
+
+def test_oversized_upload_is_rejected_before_reading(client, folders, monkeypatch):
+    monkeypatch.setattr(api_server, 'MAX_FILE_SIZE', 64)
+    response = upload(client, data=CSV_DATA * 10)
+
+    assert response.status_code == 413
+    assert response.data == api_server.TOO_LARGE_RESPONSE
+    assert os.listdir(folders / 'uploads') == []
+
+
+# Result cache
+
+@pytest.fixture
+def counted_processing(monkeypatch):
+    """Count real process_dataset calls on the emotion preprocessor"""
+    processor = api_server.get_preprocessor('emotion')
+    calls = []
+    process = processor.process_dataset
+
+    def counting(*args, **kwargs):
+        calls.append(args)
+        return process(*args, **kwargs)
+
+    monkeypatch.setattr(processor, 'process_dataset', counting)
+    return calls
+
+
+def test_result_cache_hit_skips_processing(folders, counted_processing):
+    path = folders / 'input.csv'
+    path.write_bytes(CSV_DATA)
+
+    first = api_server.process_dataset_cached(str(path), 'emotion', 'date', 'text')
+    second = api_server.process_dataset_cached(str(path), 'emotion', 'date', 'text')
+
+    assert len(counted_processing) == 1
+    assert second['data'] == first['data']
+    created = first['metadata'].pop('created')
+    assert second['metadata'].pop('created') >= created
+    assert second['metadata'] == first['metadata']
+
+
+def test_result_cache_hit_describes_the_current_request(folders, counted_processing):
+    first_path = folders / 'first.csv'
+    first_path.write_bytes(CSV_DATA)
+    second_path = folders / 'second.csv'
+    second_path.write_bytes(CSV_DATA)
+    first = api_server.process_dataset_cached(str(first_path), 'emotion', 'date', 'text')
+    progress = []
+
+    second = api_server.process_dataset_cached(
+        str(second_path), 'emotion', 'date', 'text',
+        progress_callback=lambda *update: progress.append(update)
+    )
+
+    assert len(counted_processing) == 1
+    assert second['metadata']['dataset_name'] == 'second'
+    assert second['metadata']['created'] >= first['metadata']['created']
+    assert second['data'] == first['data']
+    # The progress stream still gets a final update
+    assert progress == [(3, 3, "Using cached result...")]
+
+
+def test_result_cache_misses_on_changed_input(folders, counted_processing, monkeypatch):
+    path = folders / 'input.csv'
+    path.write_bytes(CSV_DATA)
+    api_server.process_dataset_cached(str(path), 'emotion', 'date', 'text')
+
+    path.write_bytes(CSV_DATA + b"2020-03-01,Something new\n")
+    api_server.process_dataset_cached(str(path), 'emotion', 'date', 'text')
+    assert len(counted_processing) == 2
+
+    renamed = folders / 'renamed.csv'
+    renamed.write_bytes(CSV_DATA.replace(b'date,text', b'date,body', 1))
+    api_server.process_dataset_cached(str(renamed), 'emotion', 'date', 'body')
+    assert len(counted_processing) == 3
+
+    monkeypatch.setattr(api_server, 'PROCESSING_VERSION', 'upgraded')
+    api_server.process_dataset_cached(str(path), 'emotion', 'date', 'text')
+    assert len(counted_processing) == 4
+
+
+def test_prune_result_cache_removes_old_then_least_recently_used(folders, monkeypatch):
+    cache = folders / 'cache'
+    cache.mkdir()
+    now = time.time()
+    for name, age in [('expired.json', 30 * 24 * 3600), ('older.json', 300),
+                      ('newer.json', 200), ('newest.json.gz', 100), ('partial.json.x.tmp', 0)]:
+        path = cache / name
+        path.write_bytes(b'x' * 100)
+        os.utime(path, (now - age, now - age))
+    monkeypatch.setattr(api_server, 'RESULT_CACHE_MAX_BYTES', 250)
+
+    api_server.prune_result_cache()
+
+    assert sorted(os.listdir(cache)) == ['newer.json', 'newest.json.gz', 'partial.json.x.tmp']
+
+
+# Analyze-text results
+
+class RecordingAnalyzer:
+    """Analyzer that records its batches and rejects non-str texts"""
+
+    def __init__(self, delay=0.0):
+        self.batches = []
+        self.delay = delay
+
+    def batch_analyze(self, texts, batch_size=32, raise_errors=False):
+        self.batches.append(list(texts))
+        time.sleep(self.delay)
+        return [{"emotion": "joy", "length": len(text.strip())} for text in texts]
+
+
+@pytest.fixture
+def wide_window(monkeypatch):
+    """Give the batcher time to collect every text a test submits"""
+    monkeypatch.setattr(api_server, 'ANALYSIS_BATCH_WINDOW', 0.2)
+
+
+def test_batcher_isolates_a_failing_text(wide_window):
+    analyzer = RecordingAnalyzer()
+    batcher = api_server.AnalysisBatcher(analyzer)
+    futures = [batcher.submit(text) for text in ['good', 123, 'fine', None]]
+
+    assert futures[0].result(timeout=5) == {"emotion": "joy", "length": 4}
+    assert futures[2].result(timeout=5) == {"emotion": "joy", "length": 4}
+    errors = [futures[1].exception(timeout=5), futures[3].exception(timeout=5)]
+    assert all(isinstance(error, AttributeError) for error in errors)
+    # Each failed request gets its own exception object
+    assert errors[0] is not errors[1]
+    # All four went out as one batch before being retried one by one
+    assert analyzer.batches == [['good', 123, 'fine', None], ['good'], [123], ['fine'], [None]]
+
+
+def test_batcher_coalesces_concurrent_texts(wide_window):
+    analyzer = RecordingAnalyzer()
+    batcher = api_server.AnalysisBatcher(analyzer)
+    futures = [batcher.submit(f'text {i}') for i in range(5)]
+
+    assert [future.result(timeout=5)["length"] for future in futures] == [6] * 5
+    assert analyzer.batches == [[f'text {i}' for i in range(5)]]
+
+
+class FailingPipeline:
+    """Model pipeline that fails any batch containing 'boom'"""
+
+    def __call__(self, texts, top_k=None, batch_size=1):
+        if any("boom" in text for text in texts):
+            raise RuntimeError("model failure")
+        return [[{"label": "joy", "score": 0.9}, {"label": "anger", "score": 0.1}] for _ in texts]
+
+
+@pytest.fixture
+def real_analyzer(real_sentiment_analyzer):
+    """The real SentimentAnalyzer with a FailingPipeline as its model"""
+    analyzer = object.__new__(real_sentiment_analyzer.SentimentAnalyzer)
+    analyzer.model_type = "emotion"
+    analyzer.emotion_labels = {"joy": 1.0, "anger": -1.0}
+    analyzer.model = FailingPipeline()
+    return analyzer
+
+
+def test_batcher_isolates_a_model_failure(wide_window, real_analyzer):
+    batcher = api_server.AnalysisBatcher(real_analyzer)
+    futures = [batcher.submit(text) for text in ['good text', 'boom text', 'fine text']]
+
+    # The other texts get real results, not the neutral fallback
+    assert futures[0].result(timeout=5)["emotion"] == "joy"
+    assert futures[2].result(timeout=5)["emotion"] == "joy"
+    with pytest.raises(RuntimeError):
+        futures[1].result(timeout=5)
+
+
+@pytest.mark.parametrize("text", [["bad"], 123, None])
+def test_analyze_text_rejects_non_string_text(client, text):
+    response = client.post('/api/analyze-text', json={'text': text})
+
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize("text", ["", "   "])
+def test_analyze_text_empty_text_is_neutral(client, monkeypatch, real_analyzer, text):
+    monkeypatch.setitem(api_server.analysis_batchers, 'emotion', api_server.AnalysisBatcher(real_analyzer))
+    response = client.post('/api/analyze-text', json={'text': text})
+
+    assert response.status_code == 200
+    assert response.get_json()["analysis"]["emotion"] == "neutral"
+
+
+def test_analyze_text_bad_request_does_not_fail_others(client, monkeypatch):
+    analyzer = RecordingAnalyzer()
+    monkeypatch.setitem(api_server.analysis_batchers, 'emotion', api_server.AnalysisBatcher(analyzer))
+    statuses = {}
+
+    def post(i, text):
+        statuses[i] = client.post('/api/analyze-text', json={'text': text}).status_code
+
+    texts = ['one text', 'another', ['bad'], 'third one', 42, 'last']
+    threads = [threading.Thread(target=post, args=item) for item in enumerate(texts)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert statuses == {0: 200, 1: 200, 2: 400, 3: 200, 4: 400, 5: 200}
+
+
+def test_analyze_text_times_out(client, monkeypatch):
+    monkeypatch.setattr(api_server, 'ANALYSIS_TIMEOUT', 0.05)
+    monkeypatch.setitem(
+        api_server.analysis_batchers, 'emotion', api_server.AnalysisBatcher(RecordingAnalyzer(delay=0.5))
+    )
+    response = client.post('/api/analyze-text', json={'text': 'slow text'})
+
+    assert response.status_code == 504
+
+
+def test_analyze_text_reuses_cached_result(client, monkeypatch):
+    analyzer = RecordingAnalyzer()
+    monkeypatch.setitem(api_server.analysis_batchers, 'emotion', api_server.AnalysisBatcher(analyzer))
+    first = client.post('/api/analyze-text', json={'text': 'same text'})
+    second = client.post('/api/analyze-text', json={'text': 'same text'})
+
+    assert first.get_json() == second.get_json()
+    assert analyzer.batches == [['same text']]
+
+
+def test_analyze_text_does_not_cache_a_failed_analysis(client, monkeypatch, real_analyzer):
+    monkeypatch.setitem(api_server.analysis_batchers, 'emotion', api_server.AnalysisBatcher(real_analyzer))
+    failure = client.post('/api/analyze-text', json={'text': 'boom once'})
+    real_analyzer.model = lambda texts, **kwargs: [[{"label": "anger", "score": 1.0}] for _ in texts]
+    retry = client.post('/api/analyze-text', json={'text': 'boom once'})
+
+    assert failure.status_code == 500
+    assert retry.get_json()["analysis"]["emotion"] == "anger"
+
+
+def test_analyze_text_does_not_cache_a_failed_topic(client, monkeypatch, real_sentiment_analyzer):
+    def failing_model(text, labels, multi_class=False):
+        raise RuntimeError("CUDA error")
+
+    detector = object.__new__(real_sentiment_analyzer.TopicDetector)
+    detector.model = failing_model
+    monkeypatch.setattr(api_server.get_preprocessor('topic'), 'topic_detector', detector)
+    request = {'text': 'the match went to extra time', 'sentiment_model': 'topic'}
+    failure = client.post('/api/analyze-text', json=request)
+    detector.model = lambda text, labels, multi_class=False: {"labels": ["Sports", "Politics"], "scores": [0.8, 0.2]}
+    retry = client.post('/api/analyze-text', json=request)
+
+    assert failure.status_code == 500
+    assert retry.get_json()["analysis"]["topic"] == "Sports"
+
+
+# Data file serving
+
+@pytest.fixture
+def data_file(folders):
+    data_folder = folders / 'data'
+    data_folder.mkdir()
+    path = data_folder / 'words.json'
+    path.write_bytes(b'{"metadata":{},"data":[' + b','.join([b'{"date":"2020"}'] * 200) + b']}')
+    return path
+
+
+def test_data_file_etag_and_304(client, data_file):
+    response = client.get('/data/words.json')
+    assert response.status_code == 200
+    assert response.data == data_file.read_bytes()
+    etag = response.headers['ETag']
+
+    cached = client.get('/data/words.json', headers={'If-None-Match': etag})
+    assert cached.status_code == 304
+    assert cached.data == b''
+
+
+def test_data_file_gzip_for_accepting_clients(client, data_file):
+    response = client.get('/data/words.json', headers={'Accept-Encoding': 'gzip'})
+
+    assert response.status_code == 200
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert gzip.decompress(response.data) == data_file.read_bytes()
+
+    etag = response.headers['ETag']
+    cached = client.get('/data/words.json', headers={'Accept-Encoding': 'gzip', 'If-None-Match': etag})
+    assert cached.status_code == 304
+
+
+def test_small_data_file_is_not_compressed(client, folders):
+    (folders / 'data').mkdir()
+    (folders / 'data' / 'tiny.json').write_bytes(b'{}')
+    response = client.get('/data/tiny.json', headers={'Accept-Encoding': 'gzip'})
+
+    assert response.status_code == 200
+    assert 'Content-Encoding' not in response.headers
+    assert response.data == b'{}'
+
+
+def test_gzip_copy_is_replaced_when_the_file_changes(client, folders, data_file):
+    client.get('/data/words.json', headers={'Accept-Encoding': 'gzip'})
+    data_file.write_bytes(data_file.read_bytes().replace(b'2020', b'2021'))
+    response = client.get('/data/words.json', headers={'Accept-Encoding': 'gzip'})
+
+    assert gzip.decompress(response.data) == data_file.read_bytes()
+    assert len(list((folders / 'cache').glob('*.json.gz'))) == 1
+
+
+def test_range_request_gets_the_identity_file(client, data_file):
+    response = client.get('/data/words.json', headers={'Accept-Encoding': 'gzip', 'Range': 'bytes=0-11'})
+
+    assert response.status_code == 206
+    assert 'Content-Encoding' not in response.headers
+    assert response.data == data_file.read_bytes()[:12]
+
+
+@pytest.fixture
+def compressions(monkeypatch):
+    """Count (slowed down) gzip compressions"""
+    calls = []
+    copyfileobj = api_server.shutil.copyfileobj
+
+    def counting(*args, **kwargs):
+        calls.append(args)
+        time.sleep(0.05)
+        return copyfileobj(*args, **kwargs)
+
+    monkeypatch.setattr(api_server.shutil, 'copyfileobj', counting)
+    return calls
+
+
+def test_concurrent_first_requests_compress_once(folders, data_file, compressions):
+    file_stat = os.stat(data_file)
+    paths = []
+    threads = [
+        threading.Thread(target=lambda: paths.append(api_server.gzip_data_file(str(data_file), file_stat)))
+        for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(compressions) == 1
+    assert len(set(paths)) == 1
+
+
+def test_saved_data_file_is_compressed_up_front(client, folders, compressions):
+    (folders / 'data').mkdir()
+    result = {"metadata": {}, "data": [{"date": "2020", "words": {"joy": []}}] * 100}
+    api_server.save_data_file(folders / 'data' / 'saved.json', result)
+    assert len(compressions) == 1
+
+    response = client.get('/data/saved.json', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert len(compressions) == 1
+
+
+def test_data_file_outside_data_folder_is_refused(client, data_file):
+    response = client.get('/data/../words.json')
+
+    assert response.status_code in (403, 404)
+    assert response.status_code != 200
+
+
+def test_symlink_out_of_data_folder_is_refused(client, folders, data_file):
+    secret = folders / 'secret.json'
+    secret.write_text('{"token": "x"}')
+    (folders / 'data' / 'link.json').symlink_to(secret)
+    (folders / 'data' / 'alias.json').symlink_to(data_file)
+
+    assert client.get('/data/link.json').status_code == 403
+    # Links that stay inside the data folder are still served
+    assert client.get('/data/alias.json').data == data_file.read_bytes()
@@ -0,0 +1,213 @@
+"""
+Preprocessing tests. process_dataset is checked against a straight port
+of the original per-word Counter/list aggregation, for every model type.
+"""
+
+import json
+import random
+from collections import Counter, defaultdict
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import preprocess
+from preprocess import DataPreprocessor
+
+
+MODELS = ["emotion", "goemotions", "sentiment", "topic", "happiness"]
+
+VOCABULARY = [
+    "market", "rally", "stocks", "technology", "election", "vote", "senate",
+    "league", "season", "goal", "coach", "storm", "river", "energy", "climate",
+    "vaccine", "doctors", "school", "budget", "startup", "phone", "robot",
+    "satellite", "festival", "museum", "airport", "harvest", "housing"
+]
+
+
+def write_dataset(path, rows=400, seed=0):
+    rng = random.Random(seed)
+    dates = ["2019-11-03", "2019-12-14", "2020-01-20", "2020-02-08", "2020-03-30", "2021", "03/15/2020"]
+    texts = []
+    for _ in range(rows):
+        words = rng.choices(VOCABULARY, k=rng.randint(1, 9))
+        text = ' '.join(words).capitalize() + rng.choice(['.', '!', '...', ' -- really.', ''])
+        texts.append(text if rng.random() > 0.05 else None)
+    pd.DataFrame({
+        'date': [rng.choice(dates) for _ in range(rows)],
+        'text': texts
+    }).to_csv(path, index=False)
+
+
+def reference_process(processor, filepath):
+    """Original aggregation: returns {period: [word entry, ...]} in output order"""
+    df = processor.load_data(filepath)
+
+    words_by_period = defaultdict(Counter)
+    sentiment_by_word_period = defaultdict(lambda: defaultdict(list))
+    label_by_word_period = defaultdict(lambda: defaultdict(list))
+    emotion = None
+    emotion_counts = Counter()
+
+    for text, date in zip(df['text'], df['date']):
+        if pd.isna(text):
+            continue
+        year, period = processor.parse_date(date)
+        if processor.use_topics:
+            sentiment_score = 0.0
+            emotion = "neutral"
+            label = processor.topic_detector.detect_topic(text)["topic"]
+        elif processor.use_happiness:
+            emotion = processor.happiness_scorer.categorize(text)
+            sentiment_score = processor.happiness_scorer.score(text) / 100.0 * 2 - 1
+            label = emotion
+        else:
+            analysis = processor.sentiment_analyzer.batch_analyze([text])[0]
+            sentiment_score = analysis["sentiment_score"]
+            emotion = analysis["emotion"]
+            label = emotion
+            if processor.model_type == "emotion":
+                emotion_counts[emotion] += 1
+
+        for word in preprocess._extract_words_worker(text):
+            words_by_period[period][word] += 1
+            sentiment_by_word_period[period][word].append(sentiment_score)
+            label_by_word_period[period][word].append(label)
+
+    # The emotion distribution log loop rebinds emotion to its last entry
+    for emotion, count in sorted(emotion_counts.items(), key=lambda x: x[1], reverse=True):
+        pass
+
+    periods = sorted(words_by_period)
+    output = {}
+    for i, period in enumerate(periods):
+        prev_freqs = words_by_period[periods[i - 1]] if i > 0 else Counter()
+        entries = []
+        for word, freq in words_by_period[period].items():
+            primary_label = Counter(label_by_word_period[period][word]).most_common(1)[0][0]
+            avg_sentiment = np.mean(sentiment_by_word_period[period][word])
+            if processor.use_topics:
+                avg_sentiment = 0.0
+                color = processor.topic_detector.get_color_for_topic(primary_label)
+                category = primary_label
+            elif processor.use_happiness:
+                color = processor.get_happiness_color(primary_label)
+                category = primary_label
+            elif processor.model_type in ("emotion", "goemotions"):
+                color = processor.sentiment_analyzer.get_color_for_sentiment(avg_sentiment, primary_label)
+                category = primary_label
+            else:
+                color = processor.sentiment_analyzer.get_color_for_sentiment(avg_sentiment)
+                if avg_sentiment > 0.3:
+                    category = "Positive"
+                elif avg_sentiment < -0.3:
+                    category = "Negative"
+                else:
+                    category = "Neutral"
+            entries.append({
+                "text": word,
+                "frequency": freq,
+                "sudden": (freq + 1) / (prev_freqs.get(word, 0) + 1),
+                "sentiment": float(avg_sentiment),
+                # Every entry carries the same leftover emotion
+                "emotion": emotion if emotion else "neutral",
+                "color": color,
+                "topic": category,
+                "id": f"{word}_{period.replace('-', '_')}"
+            })
+        output[period] = entries
+    return output
+
+
+@pytest.fixture(scope="module")
+def dataset(tmp_path_factory):
+    path = tmp_path_factory.mktemp("aggregation") / "news.csv"
+    write_dataset(path)
+    return str(path)
+
+
+@pytest.mark.parametrize("model", MODELS)
+def test_process_dataset_matches_reference(dataset, model):
+    processor = DataPreprocessor(sentiment_model=model)
+    result = processor.process_dataset(dataset)
+    expected = reference_process(processor, dataset)
+
+    assert [period["date"] for period in result["data"]] == list(expected)
+    assert result["metadata"]["periods"] == list(expected)
+    for period in result["data"]:
+        categories = list(period["words"])
+        actual = [entry for entries in period["words"].values() for entry in entries]
+        reference = expected[period["date"]]
+        # Within a category, words keep first-seen order
+        reference = sorted(reference, key=lambda entry: categories.index(entry["topic"]))
+        assert [entry["text"] for entry in actual] == [entry["text"] for entry in reference]
+        for entry, ref in zip(actual, reference):
+            assert entry["sentiment"] == pytest.approx(ref.pop("sentiment"), abs=1e-12)
+            assert {key: value for key, value in entry.items() if key != "sentiment"} == ref
+    assert result["metadata"]["total_unique_words"] == len(expected[list(expected)[-1]])
+
+
+def test_compute_sudden_attention():
+    frequencies = pd.Series(
+        [4, 1, 2, 9, 3],
+        index=pd.MultiIndex.from_tuples([
+            ("2020-01", "market"), ("2020-01", "storm"),
+            ("2020-02", "market"), ("2020-02", "vote"),
+            ("2020-03", "storm")
+        ], names=["period", "word"])
+    )
+    sudden = DataPreprocessor.compute_sudden_attention(None, frequencies)
+
+    assert sudden.tolist() == [5.0, 2.0, 3 / 5, 10.0, 4.0]
+    assert sudden.index.equals(frequencies.index)
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("2020-03-15", (2020, "2020-03")),
+    ("2020-03-15 08:30:00", (2020, "2020-03")),
+    ("03/15/2020", (2020, "2020-03")),
+    ("1999", (1999, "1999-01")),
+    (2007, (2007, "2007-01")),
+])
+def test_parse_date(value, expected):
+    assert DataPreprocessor().parse_date(value) == expected
+
+
+def test_iter_data_reads_only_requested_columns_in_chunks(tmp_path):
+    path = tmp_path / "news.tsv"
+    pd.DataFrame({
+        'date': [f"2020-01-{day:02d}" for day in range(1, 11)],
+        'author': ["someone"] * 10,
+        'text': [f"story number {day}" for day in range(1, 11)]
+    }).to_csv(path, sep='\t', index=False)
+    processor = DataPreprocessor()
+
+    chunks = list(processor.iter_data(str(path), ['date', 'text', 'missing'], chunksize=4))
+
+    assert [len(chunk) for chunk in chunks] == [4, 4, 2]
+    assert all(list(chunk.columns) == ['date', 'text'] for chunk in chunks)
+    pd.testing.assert_frame_equal(
+        pd.concat(chunks, ignore_index=True), processor.load_data(str(path))[['date', 'text']]
+    )
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_json_save_and_load(tmp_path, monkeypatch, use_orjson):
+    if not use_orjson:
+        monkeypatch.setattr(preprocess, 'orjson', None)
+    elif preprocess.orjson is None:
+        pytest.skip("orjson is not installed")
+    data = {
+        "metadata": {"dataset_name": "café", "total_documents": 2},
+        "data": [{"date": "2020-01", "words": {"joy": [{"text": "rally", "sentiment": 0.25}]}}]
+    }
+    output_path = tmp_path / "out" / "words.json"
+    processor = DataPreprocessor()
+
+    processor.save_json(data, str(output_path))
+
+    assert json.loads(output_path.read_text(encoding='utf-8')) == data
+    rows = [{"date": "2020-01-05", "text": "Rally continues"}, {"date": "2020-02-01", "text": "Café opens"}]
+    input_path = tmp_path / "input.json"
+    input_path.write_text(json.dumps(rows), encoding='utf-8')
+    pd.testing.assert_frame_equal(processor.load_data(str(input_path)), pd.DataFrame(rows))
@@ -0,0 +1,93 @@
+"""
+batch_analyze tests, using the real sentiment_analyzer module from
+conftest with a fake model pipeline.
+"""
+
+import pytest
+
+
+class FakePipeline:
+    """Scores by text length and fails any batch containing 'boom'"""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, texts, top_k=None, batch_size=1):
+        self.calls.append((list(texts), batch_size))
+        if any("boom" in text for text in texts):
+            raise RuntimeError("model failure")
+        return [
+            [{"label": "joy", "score": len(text) / 1000}, {"label": "anger", "score": 1 - len(text) / 1000}]
+            for text in texts
+        ]
+
+
+@pytest.fixture
+def analyzer(real_sentiment_analyzer):
+    analyzer = object.__new__(real_sentiment_analyzer.SentimentAnalyzer)
+    analyzer.model_type = "emotion"
+    analyzer.emotion_labels = {"joy": 1.0, "anger": -1.0}
+    analyzer.model = FakePipeline()
+    return analyzer
+
+
+def test_results_follow_input_order(analyzer):
+    texts = ["a much longer piece of text", "short one", "medium text here"]
+    results = analyzer.batch_analyze(texts, batch_size=2)
+
+    for text, result in zip(texts, results):
+        assert result["emotion_distribution"]["joy"] == len(text) / 1000
+        assert result["sentiment_score"] == pytest.approx(2 * len(text) / 1000 - 1)
+    # Texts reach the model shortest first, in batches of batch_size
+    assert analyzer.model.calls == [
+        (["short one", "medium text here"], 2),
+        (["a much longer piece of text"], 2)
+    ]
+
+
+def test_repeated_texts_run_once(analyzer):
+    texts = ["same words", "other words", "same words", "same words"]
+    results = analyzer.batch_analyze(texts)
+
+    assert analyzer.model.calls == [(["same words", "other words"], 32)]
+    assert results[0] == results[2] == results[3]
+    assert results[1]["confidence"] != results[0]["confidence"]
+
+
+def test_long_texts_are_truncated(analyzer):
+    results = analyzer.batch_analyze(["x" * 600, "x" * 512])
+
+    assert analyzer.model.calls == [(["x" * 512], 32)]
+    assert results[0] == results[1]
+
+
+def test_empty_texts_skip_the_model(analyzer):
+    results = analyzer.batch_analyze(["", "  ", "ok", "real text"])
+
+    assert analyzer.model.calls == [(["real text"], 32)]
+    assert [result["emotion"] for result in results[:3]] == ["neutral"] * 3
+
+
+def test_failing_batch_falls_back_to_neutral(analyzer):
+    texts = ["fine", "boom!", "also fine here"]
+    results = analyzer.batch_analyze(texts, batch_size=1)
+
+    assert results[1] == {
+        "sentiment_score": 0.0,
+        "emotion": "neutral",
+        "emotion_distribution": {"neutral": 1.0},
+        "confidence": 0.5
+    }
+    # Other batches are unaffected
+    assert results[0]["emotion_distribution"]["joy"] == 4 / 1000
+    assert results[2]["emotion_distribution"]["joy"] == 14 / 1000
+
+
+def test_failing_batch_raises_when_asked(analyzer):
+    with pytest.raises(RuntimeError):
+        analyzer.batch_analyze(["fine", "boom!"], raise_errors=True)
+
+
+def test_empty_input(analyzer):
+    assert analyzer.batch_analyze([]) == []
+    assert analyzer.model.calls == []
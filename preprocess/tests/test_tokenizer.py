@@ -0,0 +1,70 @@
+"""
+Tokenizer tests: TOKEN_PATTERN must find the same alphabetic tokens as
+nltk's word_tokenize did on cleaned text.
+"""
+
+import random
+import re
+
+import pytest
+from nltk.tokenize import NLTKWordTokenizer
+
+from preprocess import _clean_text, _extract_words_worker, _tokenize_words
+
+
+def nltk_tokens(text: str) -> list:
+    """
+    Unique alphabetic tokens of word_tokenize, with punkt's sentence split
+    approximated by splitting after every period followed by whitespace.
+    """
+    tokenizer = NLTKWordTokenizer()
+    tokens = []
+    for sentence in re.split(r'(?<=\.)\s+', text):
+        tokens.extend(tokenizer.tokenize(sentence))
+    return sorted({token for token in tokens if token.isalpha()})
+
+
+def regex_tokens(text: str) -> list:
+    return sorted(_tokenize_words(text, frozenset(), 1))
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("hello world", ["hello", "world"]),
+    ("hello...world", ["hello", "world"]),
+    ("hello..world", ["hello", "world"]),
+    ("hello....world", ["hello", "world"]),
+    ("...hello", ["hello"]),
+    ("hello...", ["hello"]),
+    ("end of sentence. next one.", ["end", "next", "of", "one", "sentence"]),
+    ("hello.world", []),
+    ("hello-world", []),
+    ("hello--world", ["hello", "world"]),
+    ("hello---world", ["hello"]),
+    ("hello----world", ["hello", "world"]),
+    ("hello.--world", ["world"]),
+    ("abc123 x1 42", []),
+    ("cannot gonna", ["can", "gon", "na", "not"]),
+])
+def test_punctuation_edge_cases(text, expected):
+    assert regex_tokens(text) == expected
+    assert nltk_tokens(text) == expected
+
+
+def test_matches_nltk_on_random_cleaned_text():
+    rng = random.Random(0)
+    pieces = ['ab', 'cd', 'x', 'word', '.', '..', '...', ' ', '-', '--', '---', '1']
+    for _ in range(5000):
+        text = ' '.join(''.join(rng.choice(pieces) for _ in range(rng.randint(1, 10))).split())
+        assert regex_tokens(text) == nltk_tokens(text), text
+
+
+def test_matches_nltk_after_cleaning():
+    raw = ("Wait... what?! I can't believe it's 3 p.m. already -- see http://x.y "
+           "<b>bold</b> e.g. well-known self--made. The U.S. economy...grew")
+    cleaned = _clean_text(raw)
+    assert regex_tokens(cleaned) == nltk_tokens(cleaned)
+
+
+def test_extract_words_drops_stopwords_and_short_words():
+    words = _extract_words_worker("The economy...grew and it is growing!")
+    assert sorted(words) == ["economy", "grew", "growing"]
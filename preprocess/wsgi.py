@@ -0,0 +1,9 @@
+"""
+WSGI entry point for running the WordStream API under a production server
+
+    gunicorn -c gunicorn_conf.py wsgi:application
+"""
+
+from api_server import app as application, start_background_tasks
+
+start_background_tasks()